@@ -0,0 +1,106 @@
+import numpy as np
+
+
+# Running mean and variance of a vector (Welford), updated one value or one batch at a time
+class RunningStats:
+    def __init__(self, size):
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+
+    # Function to add one vector of shape (size,)
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    # Function to add a batch of shape (B, size), merged with Chan's formula
+    def update_batch(self, values):
+        values = np.asarray(values, dtype=float)
+        other = RunningStats(values.shape[-1])
+        other.count = len(values)
+        other.mean = values.mean(axis=0)
+        other.m2 = ((values - other.mean) ** 2).sum(axis=0)
+        self.merge(other)
+
+    # Function to merge the stats of another stream into this one
+    def merge(self, other):
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / total
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+
+    # Sample variance (0 until there are two values)
+    def variance(self):
+        if self.count < 2:
+            return np.zeros_like(self.m2)
+        return self.m2 / (self.count - 1)
+
+
+# Constant-memory aggregation of expert results: running mean/variance of every weight vector
+# and of the scores, plus the running mean of their logs for geometric-mean aggregation
+class StreamingAggregator:
+    def __init__(self):
+        self.stats = {}
+        self.log_stats = {}
+
+    @property
+    def count(self):
+        return self.stats["scores"].count if "scores" in self.stats else 0
+
+    def _values(self, result):
+        values = dict(result["weights"])
+        values["scores"] = result["scores"]
+        return values
+
+    def _stats_for(self, key, size):
+        if key not in self.stats:
+            self.stats[key] = RunningStats(size)
+            self.log_stats[key] = RunningStats(size)
+        return self.stats[key], self.log_stats[key]
+
+    # Function to add the result of one expert (as returned by ahp_for_one_expert)
+    def update(self, result):
+        for key, value in self._values(result).items():
+            stats, log_stats = self._stats_for(key, len(value))
+            stats.update(value)
+            log_stats.update(np.log(value))
+
+    # Function to add the results of a batch of experts (as returned by simulate_experts)
+    def update_batch(self, result):
+        for key, values in self._values(result).items():
+            stats, log_stats = self._stats_for(key, values.shape[-1])
+            stats.update_batch(values)
+            log_stats.update_batch(np.log(values))
+
+    # Function to merge another aggregator (e.g. of another shard) into this one
+    def merge(self, other):
+        for key, stats in other.stats.items():
+            own, own_log = self._stats_for(key, len(stats.mean))
+            own.merge(stats)
+            own_log.merge(other.log_stats[key])
+
+    # Arithmetic mean of a weight vector or of the scores
+    def mean(self, key):
+        return self.stats[key].mean.copy()
+
+    # Sample variance of a weight vector or of the scores
+    def variance(self, key):
+        return self.stats[key].variance()
+
+    # Geometric mean of the individual priorities, normalized to sum to 1
+    def geometric_mean(self, key):
+        g = np.exp(self.log_stats[key].mean)
+        return g / g.sum()
+
+    # Function to get the aggregated vector with the chosen method ("arithmetic" or "geometric")
+    def aggregate(self, key, method="arithmetic"):
+        if method == "arithmetic":
+            return self.mean(key)
+        if method == "geometric":
+            return self.geometric_mean(key)
+        raise ValueError(f"Unknown aggregation method: {method}")
@@ -1,83 +1,68 @@
 import numpy as np
+from aggregation import StreamingAggregator
+from batch_ahp import SAATY_SCALE, ahp_batch, ahp_for_matrices, calculate_weights_batch, generate_consistent_matrices
+from hierarchy import AHP_HIERARCHY
+from instrumentation import count, phase
+from random_index import random_index
+from result_writers import ReportWriter
+from saaty_table import sample_consistent_3x3
 
 # Function to calculate weights
-def calculate_weights(matrix):
+# method="eigenvector" gives the exact principal eigenvector instead of the approximation
+def calculate_weights(matrix, method="approximate"):
+    if method != "approximate":
+        return calculate_weights_batch(matrix, method)
     normalized = matrix / matrix.sum(axis=0)
     return normalized.mean(axis=1)
 
 # Function to calculate CR
-def calculate_cr(matrix):
+def calculate_cr(matrix, method="approximate"):
     n = matrix.shape[0]
     if n <= 2: return 0.0 #For matrices smaller than 3x3
+    if method != "approximate":
+        return ahp_batch(matrix, method)[1]
     weights = calculate_weights(matrix)
     weighted_sum = np.dot(matrix, weights)
     l_max = np.mean(weighted_sum / weights)
     CI = (l_max - n) / (n - 1)
-    RI = 0.58 # 0.58 because we only have 3x3 matrices, except the 2x2 that we return 0.0
+    RI = random_index(n)
     return CI / RI if RI != 0 else 0.0
 
 # FUnction to generate random matrices
-def generate_random_matrix(size):
-    scale = [1, 2, 3, 4, 5, 6, 7, 8, 9, 1/2, 1/3, 1/4, 1/5, 1/6, 1/7, 1/8, 1/9]
+def generate_random_matrix(size, rng=None):
+    rng = np.random if rng is None else rng
+    scale = SAATY_SCALE
     matrix = np.ones((size, size))
     for i in range(size):
         for j in range(i + 1, size):
-            val = np.random.choice(scale)
+            val = rng.choice(scale)
             matrix[i][j] = val
             matrix[j][i] = 1 / val
     return matrix
 
 # Function to generate random matrix
-def generate_consistent_matrix(size):
-    while True:
-        m = generate_random_matrix(size)
-        # If cr of the matrix is < 0.1 then return the matrix, else generates the matrix again
-        if calculate_cr(m) < 0.1:
-            return m
+def generate_consistent_matrix(size, rng=None):
+    # 3x3 matrices are drawn directly from the precomputed consistent subset
+    if size == 3:
+        return sample_consistent_3x3(rng=rng)
+    # Other sizes from the block sampler, which draws and filters whole blocks of candidates
+    return generate_consistent_matrices(size, 1, rng=rng)[0][0]
 
 # Analysis for one expert
-def ahp_for_one_expert():
-    # Generate all matrices
-    matrices = {
-        "criteria": generate_consistent_matrix(3),
-        "economic": generate_consistent_matrix(2),
-        "performance": generate_consistent_matrix(3),
-        "social": generate_consistent_matrix(2),
-        "dev_cost": generate_consistent_matrix(3),
-        "maint_cost": generate_consistent_matrix(3),
-        "reliability": generate_consistent_matrix(3),
-        "speed": generate_consistent_matrix(3),
-        "security": generate_consistent_matrix(3),
-        "compat": generate_consistent_matrix(3),
-        "usability": generate_consistent_matrix(3)
-    }
+def ahp_for_one_expert(rng=None, method="approximate"):
+    # Generate all matrices, one per node of the hierarchy
+    with phase("matrix_generation"):
+        matrices = {
+            node.key: generate_consistent_matrix(AHP_HIERARCHY.size(node.key), rng)
+            for node in AHP_HIERARCHY.nodes
+        }
 
-    # Calculate weights and cr
-    weights = {k: calculate_weights(m) for k, m in matrices.items()}
-    crs = {k: calculate_cr(m) for k, m in matrices.items()}
+    # Calculate weights and cr, one batched call per matrix size
+    weights, crs = ahp_for_matrices(matrices, method)
 
     # Calculates final alternative scores
-    criteria_weights = weights["criteria"]
-    economic_weights = weights["economic"]
-    performance_weights = weights["performance"]
-    social_weights = weights["social"]
-
-    alternative_scores = np.zeros(3)
-    for i in range(3):
-        economic = criteria_weights[0] * (
-            economic_weights[0] * weights["dev_cost"][i] +
-            economic_weights[1] * weights["maint_cost"][i]
-        )
-        performance = criteria_weights[1] * (
-            performance_weights[0] * weights["reliability"][i] +
-            performance_weights[1] * weights["speed"][i] +
-            performance_weights[2] * weights["security"][i]
-        )
-        social = criteria_weights[2] * (
-            social_weights[0] * weights["compat"][i] +
-            social_weights[1] * weights["usability"][i]
-        )
-        alternative_scores[i] = economic + performance + social
+    with phase("scoring"):
+        alternative_scores = AHP_HIERARCHY.global_priorities(weights)
 
     return {
         "weights": weights,
@@ -85,90 +70,62 @@ def ahp_for_one_expert():
         "scores": alternative_scores
     }
 
+# Analysis for a whole batch of experts at once: every matrix of the hierarchy is generated,
+# weighted and scored as a (n_experts, n, n) stack
+def simulate_experts(n_experts, rng=None, method="approximate"):
+    weights, crs = {}, {}
+    for node in AHP_HIERARCHY.nodes:
+        size = AHP_HIERARCHY.size(node.key)
+        with phase("matrix_generation"):
+            if size == 3:
+                matrices = sample_consistent_3x3(n_experts, rng)
+            else:
+                matrices, _ = generate_consistent_matrices(size, n_experts, rng=rng)
+        weights[node.key], crs[node.key] = ahp_batch(matrices, method)
+
+    with phase("scoring"):
+        scores = AHP_HIERARCHY.global_priorities(weights)
+    return {
+        "weights": weights,
+        "crs": crs,
+        "scores": scores
+    }
+
 # Analysis for all the experts
-def complete_ahp_analysis(n_experts=10):
-    all_results = []
+# Results are folded into a streaming aggregator, so memory stays constant in n_experts.
+# Pass your own aggregator to read partial aggregates while the run is going.
+# aggregation: "arithmetic" (mean of the weights) or "geometric" (aggregation of individual priorities)
+# writers: result_writers objects that get every expert result and the final results
+# (default: the Greek report on stdout); quiet=True leaves out the per-expert part of the default report
+def complete_ahp_analysis(n_experts=10, aggregator=None, aggregation="arithmetic", writers=None, quiet=False):
+    aggregator = StreamingAggregator() if aggregator is None else aggregator
+    writers = [ReportWriter(per_expert=not quiet)] if writers is None else writers
 
     # Repeats the analysis for each expert
     for i in range(n_experts):
-        print(f"\n\t\t\t ΕΙΔΙΚΟΣ {i + 1}\n")
         result = ahp_for_one_expert()
-        weights = result["weights"]
-        crs = result["crs"]
-        scores = result["scores"]
-        all_results.append(result)
-
-        criteria = ['Οικονομικά θέματα', 'Απόδοση', 'Κοινωνική αποδοχή']
-        economic_sub = ['Κόστος ανάπτυξης', 'Κόστος συντήρησης']
-        performance_sub = ['Αξιοπιστία', 'Ταχύτητα', 'Ασφάλεια δεδομένων']
-        social_sub = ['Συμβατότητα', 'Ευχρηστία']
-        alternatives = ['Ιστοσελίδα', 'Mobile εφαρμογή', 'Κεντρικό σύστημα']
-
-        # Results for each expert
-        print("1. ΒΑΡΗ ΚΡΙΤΗΡΙΩΝ:")
-        for c, w in zip(criteria, weights["criteria"]):
-            print(f"{c}: {w:.4f}")
-        print(f"CR: {crs['criteria']:.4f}")
-
-        print("\n2. ΒΑΡΗ ΥΠΟΚΡΙΤΗΡΙΩΝ:")
-        print("Οικονομικά θέματα:")
-        for s, w in zip(economic_sub, weights["economic"]):
-            print(f"{s}: {w:.4f}")
-        print(f"CR: {crs['economic']:.4f}")
-
-        print("\nΑπόδοση:")
-        for s, w in zip(performance_sub, weights["performance"]):
-            print(f"{s}: {w:.4f}")
-        print(f"CR: {crs['performance']:.4f}")
-
-        print("\nΚοινωνική αποδοχή:")
-        for s, w in zip(social_sub, weights["social"]):
-            print(f"{s}: {w:.4f}")
-        print(f"CR: {crs['social']:.4f}")
-
-        print("\n3. ΤΕΛΙΚΗ ΒΑΘΜΟΛΟΓΙΑ ΕΝΑΛΛΑΚΤΙΚΩΝ:")
-        for alt, score in zip(alternatives, scores):
-            print(f"{alt}: {score:.4f}")
+        count("experts")
+        with phase("aggregation"):
+            aggregator.update(result)
+        with phase("output"):
+            for writer in writers:
+                writer.write(i, result)
 
     # Final results
-    print("\n\t\t\t ΣΥΝΟΛΙΚΑ ΤΕΛΙΚΑ ΑΠΟΤΕΛΕΣΜΑΤΑ\n")
-    avg_criteria = np.mean([r["weights"]["criteria"] for r in all_results], axis=0)
-    avg_economic = np.mean([r["weights"]["economic"] for r in all_results], axis=0)
-    avg_performance = np.mean([r["weights"]["performance"] for r in all_results], axis=0)
-    avg_social = np.mean([r["weights"]["social"] for r in all_results], axis=0)
-    avg_scores = np.mean([r["scores"] for r in all_results], axis=0)
-
-    print("1. ΜΕΣΟΙ ΟΡΟΙ ΒΑΡΩΝ ΚΡΙΤΗΡΙΩΝ:")
-    for c, w in zip(criteria, avg_criteria):
-        print(f"{c}: {w:.4f}")
-
-    print("\n2. ΜΕΣΟΙ ΟΡΟΙ ΥΠΟΚΡΙΤΗΡΙΩΝ:")
-    print("Οικονομικά θέματα:")
-    for s, w in zip(economic_sub, avg_economic):
-        print(f"{s}: {w:.4f}")
-
-    print("\nΑπόδοση:")
-    for s, w in zip(performance_sub, avg_performance):
-        print(f"{s}: {w:.4f}")
-
-    print("\nΚοινωνική αποδοχή:")
-    for s, w in zip(social_sub, avg_social):
-        print(f"{s}: {w:.4f}")
-
-    print("\n3. ΜΕΣΟΙ ΟΡΟΙ ΒΑΘΜΟΛΟΓΙΩΝ ΕΝΑΛΛΑΚΤΙΚΩΝ:")
-    for alt, score in zip(alternatives, avg_scores):
-        print(f"{alt}: {score:.4f}")
+    with phase("aggregation"):
+        results = {
+            "criteria_weights": aggregator.aggregate("criteria", aggregation),
+            "subcriteria_weights": {
+                node.name: aggregator.aggregate(node.key, aggregation) for node in AHP_HIERARCHY.goal.children
+            },
+            "alternative_scores": aggregator.aggregate("scores", aggregation)
+        }
+    with phase("output"):
+        for writer in writers:
+            writer.close(results)
 
     # Return results to pass them to visualization.py
-    return {
-        "criteria_weights": avg_criteria,
-        "subcriteria_weights": {
-            "Οικονομικά θέματα": avg_economic,
-            "Απόδοση": avg_performance,
-            "Κοινωνική αποδοχή": avg_social
-        },
-        "alternative_scores": avg_scores
-    }
+    return results
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+import os
+
+import numpy as np
+from instrumentation import count, phase
+
+# Directory for tables cached on disk between runs
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".ahp_cache")
+
+# The 17 values of the Saaty scale used for random judgments
+SAATY_SCALE = np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 1/2, 1/3, 1/4, 1/5, 1/6, 1/7, 1/8, 1/9])
+
+# Saaty random index per matrix size
+RANDOM_INDEX = {1: 0.0, 2: 0.0, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45}
+
+
+# Function to calculate the weights of a stack of (B, n, n) matrices at once (column-normalize-and-average approximation)
+def approximate_weights_batch(matrices):
+    matrices = np.asarray(matrices, dtype=float)
+    normalized = matrices / matrices.sum(axis=-2, keepdims=True)
+    return normalized.mean(axis=-1)
+
+
+# Function to calculate the exact principal eigenvector and lambda_max of a stack of (B, n, n) matrices
+# with batched power iteration; each matrix stops as soon as it has converged
+def power_iteration_batch(matrices, tol=1e-12, max_iter=1000, warm_start=True):
+    matrices = np.asarray(matrices, dtype=float)
+    batch_shape, n = matrices.shape[:-2], matrices.shape[-1]
+    flat = matrices.reshape(-1, n, n)
+
+    if warm_start:
+        weights = approximate_weights_batch(flat)
+    else:
+        weights = np.full((len(flat), n), 1.0 / n)
+    l_max = np.zeros(len(flat))
+
+    # Only the matrices that have not converged are multiplied in each iteration
+    active = np.arange(len(flat))
+    for _ in range(max_iter):
+        product = np.einsum('bij,bj->bi', flat[active], weights[active])
+        # With sum(w) = 1, sum(A w) is the eigenvalue estimate
+        l_max[active] = product.sum(axis=-1)
+        new_weights = product / l_max[active, None]
+        converged = np.abs(new_weights - weights[active]).max(axis=-1) < tol
+        weights[active] = new_weights
+        active = active[~converged]
+        if len(active) == 0:
+            break
+
+    return weights.reshape(batch_shape + (n,)), l_max.reshape(batch_shape)
+
+
+# Function to calculate the weights of a stack of (B, n, n) matrices at once
+# method: "approximate" (column-normalize-and-average) or "eigenvector" (exact principal eigenvector)
+def calculate_weights_batch(matrices, method="approximate"):
+    if method == "approximate":
+        return approximate_weights_batch(matrices)
+    if method == "eigenvector":
+        return power_iteration_batch(matrices)[0]
+    raise ValueError(f"Unknown priority method: {method}")
+
+
+# Function to calculate CI / RI from lambda_max of (B,) matrices of size n
+def consistency_ratio(l_max, n):
+    CI = (l_max - n) / (n - 1)
+    RI = RANDOM_INDEX.get(n)
+    if RI is None:
+        from random_index import random_index  # Imported here because random_index builds on this module
+        RI = random_index(n)
+    return CI / RI if RI != 0 else np.zeros_like(CI)
+
+
+# Function to calculate the CR of a stack of (B, n, n) matrices at once
+def calculate_cr_batch(matrices, weights=None, method="approximate"):
+    return ahp_batch(matrices, method, weights)[1]
+
+
+# Function to calculate weights and CR of a stack of matrices in one call
+# The eigenvector method gets lambda_max from the same power iteration pass as the weights
+def ahp_batch(matrices, method="approximate", weights=None):
+    matrices = np.asarray(matrices, dtype=float)
+    n = matrices.shape[-1]
+
+    if method == "eigenvector":
+        with phase("weighting"):
+            weights, l_max = power_iteration_batch(matrices)
+    elif method == "approximate":
+        with phase("weighting"):
+            if weights is None:
+                weights = approximate_weights_batch(matrices)
+        with phase("cr"):
+            weighted_sum = np.einsum('...ij,...j->...i', matrices, weights)
+            l_max = np.mean(weighted_sum / weights, axis=-1)
+    else:
+        raise ValueError(f"Unknown priority method: {method}")
+
+    if n <= 2: return weights, np.zeros(matrices.shape[:-2])  # For matrices smaller than 3x3
+    with phase("cr"):
+        return weights, consistency_ratio(l_max, n)
+
+
+# Function to calculate weights and CR for a dict of matrices, grouping them by size
+def ahp_for_matrices(matrices, method="approximate"):
+    weights, crs = {}, {}
+    by_size = {}
+    for key, m in matrices.items():
+        by_size.setdefault(m.shape[0], []).append(key)
+
+    for size, keys in by_size.items():
+        stack = np.stack([matrices[k] for k in keys])
+        if size == 3 and method == "approximate":
+            from saaty_table import lookup_3x3  # Imported here because saaty_table builds on this module
+            w, cr = lookup_3x3(stack)
+        else:
+            w, cr = ahp_batch(stack, method)
+        for idx, key in enumerate(keys):
+            weights[key] = w[idx]
+            crs[key] = cr[idx]
+    return weights, crs
+
+
+# Function to build (B, size, size) reciprocal matrices from (B, size*(size-1)/2) upper-triangle values
+def reciprocal_matrices(upper, size):
+    upper = np.asarray(upper, dtype=float)
+    matrices = np.ones(upper.shape[:-1] + (size, size))
+    rows, cols = np.triu_indices(size, k=1)
+    matrices[..., rows, cols] = upper
+    matrices[..., cols, rows] = 1 / upper
+    return matrices
+
+
+# Function to map judgment values to their index on the Saaty scale
+def scale_codes(values):
+    values = np.asarray(values, dtype=float)
+    codes = np.abs(values[..., None] - SAATY_SCALE).argmin(axis=-1)
+    if not np.allclose(SAATY_SCALE[codes], values):
+        raise ValueError("Judgments are not on the Saaty scale")
+    return codes.astype(np.uint8)
+
+
+# Function to generate a block of random reciprocal matrices on the Saaty scale
+def generate_random_matrices(size, count, rng=None):
+    rng = np.random if rng is None else rng
+    n_upper = size * (size - 1) // 2
+    codes = rng.choice(len(SAATY_SCALE), size=(count, n_upper))
+    return reciprocal_matrices(SAATY_SCALE[codes], size)
+
+
+# Function to generate k consistent matrices (CR < 0.1), drawing and filtering whole blocks of candidates
+# Returns the matrices and the acceptance rate of the draws (nan when k = 0 and nothing is drawn)
+def generate_consistent_matrices(size, k, block_size=None, rng=None):
+    if k == 0:
+        return np.empty((0, size, size)), float("nan")
+    rng = np.random if rng is None else rng
+    accepted = []
+    n_accepted, n_drawn = 0, 0
+    block = block_size or max(4 * k, 64)
+
+    while n_accepted < k:
+        with phase("matrix_generation"):
+            candidates = generate_random_matrices(size, block, rng)
+        consistent = candidates[calculate_cr_batch(candidates) < 0.1]
+        accepted.append(consistent[:k - n_accepted])
+        n_accepted += len(consistent)
+        n_drawn += block
+        count("accepted_draws", len(consistent))
+        count("rejected_draws", block - len(consistent))
+
+        # Size the next block from the acceptance rate seen so far
+        if block_size is None and n_accepted < k:
+            rate = max(n_accepted, 1) / n_drawn
+            block = int(np.ceil(1.2 * (k - n_accepted) / rate)) + 16
+
+    return np.concatenate(accepted)[:k], n_accepted / n_drawn
@@ -0,0 +1,147 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+from ahp_analysis import complete_ahp_analysis, generate_consistent_matrix
+from batch_ahp import ahp_batch, calculate_cr_batch, calculate_weights_batch, generate_consistent_matrices
+from decision_engine import evsi
+from qG import BASE_PROBABILITIES, STRATEGIES, TEST_RESULTS, calculate_evsi
+from sensitivity_analysis import ORIGINAL_SCORES, ORIGINAL_WEIGHTS, S_VALUES, prr_loop, prr_vectorized
+
+SEED = 12345
+
+
+# Function to time a call (best of repeats) and measure its peak traced memory in a separate run
+def measure(func, repeats=3):
+    times = []
+    for _ in range(repeats):
+        np.random.seed(SEED)
+        start = time.perf_counter()
+        extra = func()
+        times.append(time.perf_counter() - start)
+
+    np.random.seed(SEED)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # A benchmark may return a dict of extra metrics (e.g. the acceptance rate)
+    return min(times), peak, extra if isinstance(extra, dict) else {}
+
+
+# Benchmark cases: name -> (setup, number of items processed per call)
+# setup() builds the inputs of the case and returns the function to time; it is only called for the
+# cases that run, and every case draws its inputs from its own generator, so --only does not change them
+def benchmark_cases(quick=False):
+    scale = 10 if quick else 1
+    cases = {}
+
+    # Weights and CR at several batch sizes (a set, as the --quick sizes can repeat a full-size case)
+    for batch in sorted({1, 100, 10000, 100000 // scale}):
+        for name, func in [("calculate_weights_batch", calculate_weights_batch),
+                           ("calculate_cr_batch", calculate_cr_batch),
+                           ("ahp_batch_eigenvector", lambda m: ahp_batch(m, "eigenvector"))]:
+            def setup(func=func, batch=batch):
+                matrices, _ = generate_consistent_matrices(3, batch, rng=np.random.default_rng([SEED, batch]))
+                return lambda: func(matrices)
+            cases[f"{name}/B={batch}"] = (setup, batch)
+
+    # Consistent matrix generation: the per-matrix function and the block sampler with its acceptance rate
+    for size in [3, 4]:
+        count = 2000 // scale
+        cases[f"generate_consistent_matrix/n={size}"] = (
+            lambda size=size, count=count: lambda: [generate_consistent_matrix(size) for _ in range(count)], count)
+        count = 100000 // scale
+
+        def sampler(size=size, count=count):
+            _, rate = generate_consistent_matrices(size, count)
+            return {"acceptance_rate": rate}
+        cases[f"generate_consistent_matrices/n={size}"] = (lambda sampler=sampler: sampler, count)
+
+    # Expert simulation (its report is printed to nowhere)
+    for n_experts in sorted({10, 100, 1000 // scale}):
+        def experts(n_experts=n_experts):
+            with contextlib.redirect_stdout(io.StringIO()):
+                complete_ahp_analysis(n_experts=n_experts)
+        cases[f"complete_ahp_analysis/n_experts={n_experts}"] = (lambda experts=experts: experts, n_experts)
+
+    # PRR Monte Carlo core of parallel_perturbation_analysis, samples per s value
+    for N in sorted({1000, 10000 // scale}):
+        def loop(N=N):
+            with contextlib.redirect_stderr(io.StringIO()):
+                prr_loop(ORIGINAL_WEIGHTS, ORIGINAL_SCORES, S_VALUES, N)
+        cases[f"prr_loop/N={N}"] = (lambda loop=loop: loop, N * len(S_VALUES))
+    for N in sorted({10000, 100000, 1000000 // scale}):
+        cases[f"prr_vectorized/N={N}"] = (
+            lambda N=N: lambda: prr_vectorized(ORIGINAL_SCORES, S_VALUES, N), N * len(S_VALUES))
+
+    # EVSI of qG.py for its categories (its report is printed to nowhere)
+    def categories():
+        with contextlib.redirect_stdout(io.StringIO()):
+            calculate_evsi(STRATEGIES, BASE_PROBABILITIES, TEST_RESULTS)
+    cases["calculate_evsi/qG"] = (lambda: categories, len(STRATEGIES))
+
+    # The decision_engine.evsi core of calculate_evsi for growing numbers of states and strategies
+    # (100 decisions per call)
+    for n_states, n_strategies in [(2, 3), (10, 10), (50, 50), (200, 100 // scale)]:
+        def decisions(n_states=n_states, n_strategies=n_strategies):
+            rng = np.random.default_rng([SEED, n_states, n_strategies])
+            payoffs = rng.normal(size=(100, n_strategies, n_states))
+            priors = rng.dirichlet(np.ones(n_states), size=100)
+            likelihoods = np.moveaxis(rng.dirichlet(np.ones(5), size=(100, n_states)), -1, -2)
+            return lambda: evsi(payoffs, likelihoods, priors)
+        cases[f"evsi/states={n_states},strategies={n_strategies}"] = (decisions, 100)
+
+    return cases
+
+
+# Function to run every benchmark and write the results file
+def run_benchmarks(output_path, quick=False, only=None):
+    results = {}
+    for name, (setup, items) in benchmark_cases(quick).items():
+        if only and only not in name:
+            continue
+        seconds, peak, extra = measure(setup(), repeats=1 if quick else 3)
+        results[name] = {"seconds": seconds, "items_per_second": items / seconds,
+                         "peak_memory_bytes": peak, **extra}
+        print(f"{name:55s} {seconds * 1e3:10.2f} ms  {items / seconds:14.1f} items/s  {peak / 2**20:8.2f} MiB")
+
+    report = {
+        "meta": {"seed": SEED, "quick": quick, "python": platform.python_version(),
+                 "numpy": np.__version__, "machine": platform.machine(), "time": time.time()},
+        "results": results
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+# Function to compare two results files: speedup (>1 is faster) and memory ratio per benchmark
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)["results"]
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    for name in sorted(set(old) & set(new)):
+        speedup = old[name]["seconds"] / new[name]["seconds"]
+        memory = new[name]["peak_memory_bytes"] / max(old[name]["peak_memory_bytes"], 1)
+        print(f"{name:55s} speedup x{speedup:6.2f}  memory x{memory:6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks of the AHP, Monte Carlo and decision-analysis hot paths")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--quick", action="store_true", help="smaller problem sizes, one repeat")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--compare", metavar="OLD_RESULTS", help="compare against an earlier results file")
+    args = parser.parse_args()
+
+    run_benchmarks(args.output, args.quick, args.only)
+    if args.compare:
+        compare(args.compare, args.output)
@@ -0,0 +1,206 @@
+import argparse
+
+# Single entry point of the analyses:
+#     python cli.py ahp
+#     python cli.py experts --n-experts 1000 --workers 4
+#     python cli.py prr --N 100000 --vectorized
+#     python cli.py panel panel.ahp --simulate 1000000
+#     python cli.py stability
+#     python cli.py decision --plot
+# Every module is imported inside its subcommand, and matplotlib / seaborn / tqdm only when
+# the subcommand draws (--plot) or shows a progress bar, so numeric jobs start fast.
+
+
+# Function to print aggregated expert results (as in the final report of complete_ahp_analysis)
+def print_results(results):
+    from hierarchy import AHP_HIERARCHY
+
+    print("1. ΜΕΣΟΙ ΟΡΟΙ ΒΑΡΩΝ ΚΡΙΤΗΡΙΩΝ:")
+    for node, w in zip(AHP_HIERARCHY.goal.children, results["criteria_weights"]):
+        print(f"{node.name}: {w:.4f}")
+
+    print("\n2. ΜΕΣΟΙ ΟΡΟΙ ΥΠΟΚΡΙΤΗΡΙΩΝ:")
+    for node in AHP_HIERARCHY.goal.children:
+        print(f"{node.name}:")
+        for sub, w in zip(node.children, results["subcriteria_weights"][node.name]):
+            print(f"{sub.name}: {w:.4f}")
+
+    print("\n3. ΜΕΣΟΙ ΟΡΟΙ ΒΑΘΜΟΛΟΓΙΩΝ ΕΝΑΛΛΑΚΤΙΚΩΝ:")
+    for alt, score in zip(AHP_HIERARCHY.alternatives, results["alternative_scores"]):
+        print(f"{alt}: {score:.4f}")
+
+
+# Static AHP with the judgments of main.py
+def run_ahp(args):
+    from main import ahp_analysis
+    ahp_analysis()
+
+
+# Simulated experts, in this process or split over a process pool
+def run_experts(args):
+    if args.plot:
+        from visualization import show_visualizations
+        show_visualizations(n_experts=args.n_experts, seed=args.seed)
+    elif args.workers > 1:
+        from parallel_runner import parallel_expert_simulation
+        print_results(parallel_expert_simulation(args.n_experts, args.seed, args.workers, args.aggregation))
+    else:
+        import numpy as np
+        from ahp_analysis import complete_ahp_analysis
+        from result_writers import ReportWriter, writer_for_path
+        writers = [ReportWriter(per_expert=not args.quiet)] + [writer_for_path(path) for path in args.output]
+        np.random.seed(args.seed)
+        complete_ahp_analysis(n_experts=args.n_experts, aggregation=args.aggregation, writers=writers)
+
+
+# PRR study of sensitivity_analysis.py
+def run_prr(args):
+    import numpy as np
+    from sensitivity_analysis import (ALTERNATIVES, ORIGINAL_SCORES, S_VALUES, draw_prr,
+                                      parallel_perturbation_analysis, print_prr)
+
+    if args.workers > 1:
+        from parallel_runner import parallel_prr
+        data = {"s_values": S_VALUES, "alternatives": ALTERNATIVES, "original_scores": ORIGINAL_SCORES,
+                "prr_matrix": parallel_prr(ORIGINAL_SCORES, S_VALUES, args.N, args.seed, args.workers)}
+    elif args.estimator is not None:
+        data = parallel_perturbation_analysis(show=False, estimator=args.estimator, tol=args.tol,
+                                              rng=np.random.default_rng(args.seed))
+    else:
+        np.random.seed(args.seed)
+        data = parallel_perturbation_analysis(N=args.N, vectorized=args.vectorized, show=False,
+                                              progress=args.progress)
+
+    if args.plot:
+        import matplotlib.pyplot as plt
+        draw_prr(data)
+        plt.show()
+    print_prr(data)
+
+
+# Scores a file-backed expert panel in chunks (optionally simulating it first)
+def run_panel(args):
+    from panel_store import score_panel
+    if args.simulate:
+        import numpy as np
+        from judgment_store import JudgmentPanel
+        from panel_store import PanelWriter
+        rng = np.random.default_rng(args.seed)
+        with PanelWriter(args.path) as writer:
+            for start in range(0, args.simulate, args.chunk_size):
+                writer.append(JudgmentPanel.simulate(min(args.chunk_size, args.simulate - start), rng))
+    print_results(score_panel(args.path, args.chunk_size, aggregation=args.aggregation))
+
+
+# Exact weight-stability intervals of the static AHP model
+def run_stability(args):
+    from batch_ahp import ahp_for_matrices
+    from main import judgment_matrices
+    from weight_stability import print_stability, weight_stability
+    print_stability(weight_stability(ahp_for_matrices(judgment_matrices())[0]))
+
+
+# EMV / EVPI / EVSI and break-even analysis of qG.py
+def run_decision(args):
+    from qG import (BASE_PROBABILITIES, STRATEGIES, TEST_RESULTS, calculate_emv, calculate_evpi, calculate_evsi,
+                    plot_sensitivity_results, sensitivity_analysis)
+
+    emv_results = calculate_emv(STRATEGIES)
+    calculate_evpi(STRATEGIES, emv_results)
+    calculate_evsi(STRATEGIES, BASE_PROBABILITIES, TEST_RESULTS)
+    sensitivity_analysis(STRATEGIES, BASE_PROBABILITIES)
+    if args.plot:
+        plot_sensitivity_results(STRATEGIES, BASE_PROBABILITIES)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="AHP and decision analysis")
+    parser.add_argument("--report", metavar="PATH",
+                        help="write the instrumentation report (phase times, counters) as JSON")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("ahp", help="static AHP of main.py").set_defaults(func=run_ahp)
+
+    experts = subparsers.add_parser("experts", help="simulated expert panel")
+    experts.add_argument("--n-experts", type=int, default=10)
+    experts.add_argument("--seed", type=int, default=0)
+    experts.add_argument("--aggregation", default="arithmetic", choices=["arithmetic", "geometric"])
+    experts.add_argument("--workers", type=int, default=1)
+    experts.add_argument("--quiet", action="store_true", help="print only the final results, not every expert")
+    experts.add_argument("--output", action="append", default=[], metavar="PATH",
+                         help="also write every expert result to a .jsonl, .csv or .npz file (repeatable)")
+    experts.add_argument("--plot", action="store_true", help="show the charts of visualization.py")
+    experts.set_defaults(func=run_experts)
+
+    prr = subparsers.add_parser("prr", help="rank reversal (PRR) Monte Carlo study")
+    prr.add_argument("--N", type=int, help="samples per s value (default 10000)")
+    prr.add_argument("--seed", type=int, default=0)
+    prr.add_argument("--vectorized", action="store_true")
+    prr.add_argument("--workers", type=int, default=1, help="more than 1 runs the vectorized study in a process pool")
+    prr.add_argument("--estimator", choices=["plain", "antithetic", "sobol"],
+                     help="adaptive estimation until the confidence interval is narrower than --tol (instead of --N)")
+    prr.add_argument("--tol", type=float, default=0.005, help="half width of the 95%% confidence interval")
+    prr.add_argument("--progress", action="store_true", help="progress bar of the loop version")
+    prr.add_argument("--plot", action="store_true")
+    prr.set_defaults(func=run_prr)
+
+    panel = subparsers.add_parser("panel", help="score an expert panel file with bounded memory")
+    panel.add_argument("path")
+    panel.add_argument("--chunk-size", type=int, default=100000)
+    panel.add_argument("--aggregation", default="arithmetic", choices=["arithmetic", "geometric"])
+    panel.add_argument("--simulate", type=int, metavar="N_EXPERTS", help="first write a simulated panel to path")
+    panel.add_argument("--seed", type=int, default=0)
+    panel.set_defaults(func=run_panel)
+
+    stability = subparsers.add_parser("stability", help="weight ranges over which the top alternative stays on top")
+    stability.set_defaults(func=run_stability)
+
+    decision = subparsers.add_parser("decision", help="EMV, EVPI, EVSI and break-even points of qG.py")
+    decision.add_argument("--plot", action="store_true", help="plot the EMV lines of each category")
+    decision.set_defaults(func=run_decision)
+    return parser
+
+
+# Function to reject options that the chosen mode of a subcommand would silently ignore
+def check_args(parser, args):
+    if args.command == "experts" and args.plot:
+        ignored = [name for name, given in [("--workers", args.workers > 1), ("--quiet", args.quiet),
+                                            ("--output", args.output),
+                                            ("--aggregation", args.aggregation != "arithmetic")] if given]
+        if ignored:
+            parser.error(f"experts --plot cannot be combined with {', '.join(ignored)}")
+    elif args.command == "experts" and args.workers > 1:
+        # The shards return only their aggregators: there are no per-expert results to print or write
+        ignored = [name for name, given in [("--quiet", args.quiet), ("--output", args.output)] if given]
+        if ignored:
+            parser.error(f"experts --workers cannot be combined with {', '.join(ignored)}")
+
+    if args.command == "prr":
+        if args.estimator is not None:
+            ignored = [name for name, given in [("--N", args.N is not None), ("--vectorized", args.vectorized),
+                                                ("--progress", args.progress), ("--workers", args.workers > 1)]
+                       if given]
+            if ignored:
+                parser.error(f"prr --estimator cannot be combined with {', '.join(ignored)}")
+        elif args.workers > 1 and args.progress:
+            parser.error("prr --workers runs the vectorized study, which has no --progress bar")
+        if args.N is None:
+            args.N = 10000
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    check_args(parser, args)
+    if args.report is None:
+        args.func(args)
+        return
+
+    from instrumentation import Instrumentation
+    with Instrumentation() as inst:
+        args.func(args)
+    inst.save(args.report)
+
+
+if __name__ == "__main__":
+    main()
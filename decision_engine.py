@@ -0,0 +1,150 @@
+import re
+
+import numpy as np
+
+
+# Function to turn one category of the strategies dict into arrays:
+# names, net payoffs (strategies x states) and the state probabilities
+def strategy_arrays(options):
+    names = list(options)
+    payoffs = np.array([[result for _, result in data["results"]] for data in options.values()], dtype=float)
+    costs = np.array([data["cost"] for data in options.values()], dtype=float)
+    probabilities = np.array([p for p, _ in next(iter(options.values()))["results"]], dtype=float)
+    return names, payoffs - costs[:, None], probabilities
+
+
+# Function to turn probability dicts into arrays
+# base_probabilities: {"P(Y)": ..., "P(X)": ...} -> states and priors
+# test_results: {"P(Theta/Y)": ..., ...} -> signals and likelihoods (signals x states)
+def probability_arrays(base_probabilities, test_results):
+    states = [re.fullmatch(r"P\((.+)\)", key).group(1) for key in base_probabilities]
+    priors = np.array(list(base_probabilities.values()), dtype=float)
+
+    signals = []
+    entries = {}
+    for key, value in test_results.items():
+        signal, state = re.fullmatch(r"P\((.+)/(.+)\)", key).groups()
+        if signal not in signals:
+            signals.append(signal)
+        entries[signal, state] = value
+
+    likelihoods = np.array([[entries.get((m, s), 0.0) for s in states] for m in signals], dtype=float)
+    return states, priors, signals, likelihoods
+
+
+# All functions below broadcast over leading dimensions:
+# payoffs (..., strategies, states), priors (..., states), likelihoods (..., signals, states)
+
+# Function to calculate the EMV of every strategy
+def emv(payoffs, priors):
+    return np.einsum('...ks,...s->...k', payoffs, priors)
+
+
+# Function to calculate the expected value with perfect information: the best payoff of every state
+def ev_with_perfect_information(payoffs, priors):
+    return np.einsum('...s,...s->...', payoffs.max(axis=-2), priors)
+
+
+# Function to calculate EVPI: expected value with perfect information minus the best EMV
+def evpi(payoffs, priors):
+    return ev_with_perfect_information(payoffs, priors) - emv(payoffs, priors).max(axis=-1)
+
+
+# Function to calculate the signal probabilities and the posteriors P(state/signal) (signals x states)
+def posteriors(likelihoods, priors):
+    joint = likelihoods * priors[..., None, :]
+    marginals = joint.sum(axis=-1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return marginals, joint / marginals[..., None]
+
+
+# Function to calculate the EMV of every strategy after every signal (signals x strategies)
+def posterior_emv(payoffs, likelihoods, priors):
+    return np.einsum('...ks,...ms->...mk', payoffs, posteriors(likelihoods, priors)[1])
+
+
+# Function to calculate EVSI
+# P(m) * max_k EMV(k | m) = max_k sum_s P(m, s) payoff(k, s), so only the joint table is needed
+def evsi(payoffs, likelihoods, priors):
+    joint = likelihoods * priors[..., None, :]
+    best_per_signal = np.einsum('...ks,...ms->...mk', payoffs, joint).max(axis=-1)
+    return best_per_signal.sum(axis=-1) - emv(payoffs, priors).max(axis=-1)
+
+
+# Function to set the probability of one state to each of p_values, rescaling the others proportionally
+# Returns a (len(p_values), states) grid of priors
+def probability_grid(priors, p_values, state=0):
+    p_values = np.asarray(p_values, dtype=float)
+    rest = np.delete(priors, state)
+    rest = rest / rest.sum()
+    grid = np.insert((1 - p_values)[:, None] * rest, state, 0.0, axis=1)
+    grid[:, state] = p_values
+    return grid
+
+
+# Function to find the exact break-even probabilities of one state (others rescaled proportionally)
+# EMV_k(p) = p * a_k + (1 - p) * b_k is linear in p, so the optimal strategy only changes where two
+# lines of the upper envelope cross. Returns the break-even points in (0, 1) and the optimal strategy
+# on each of the len(points) + 1 intervals
+def break_even_probabilities(payoffs, priors, state=0):
+    rest = np.delete(priors, state)
+    a = payoffs[:, state]
+    b = np.delete(payoffs, state, axis=1) @ (rest / rest.sum())
+
+    # Crossing point of every pair of lines
+    slope = a - b
+    with np.errstate(invalid="ignore", divide="ignore"):
+        crossings = (b[None, :] - b[:, None]) / (slope[:, None] - slope[None, :])
+    crossings = np.unique(crossings[np.isfinite(crossings) & (crossings > 0) & (crossings < 1)])
+
+    # Keep the crossings where the optimal strategy actually changes
+    edges = np.concatenate(([0.0], crossings, [1.0]))
+    mids = (edges[:-1] + edges[1:]) / 2
+    best = np.argmax(mids[:, None] * a + (1 - mids[:, None]) * b, axis=1)
+    changes = np.flatnonzero(best[1:] != best[:-1])
+    return crossings[changes], np.concatenate((best[:1], best[changes + 1]))
+
+
+# Function to evaluate the EMV over a dense grid of priors and cost changes in one broadcast
+# payoffs (strategies x states), prior_grid (..., states), cost_changes (..., strategies) added to each cost
+# Returns EMVs of shape prior_grid.shape[:-1] + cost_changes.shape[:-1] + (strategies,) and the optimal strategy
+def sensitivity_grid(payoffs, prior_grid, cost_changes):
+    prior_grid = np.asarray(prior_grid, dtype=float)
+    cost_changes = np.asarray(cost_changes, dtype=float)
+    expected = emv(payoffs, prior_grid)
+    expected = expected.reshape(prior_grid.shape[:-1] + (1,) * (cost_changes.ndim - 1) + expected.shape[-1:])
+    emvs = expected - cost_changes
+    return emvs, emvs.argmax(axis=-1)
+
+
+# Function to build a broadcast grid of likelihood tables from ranges of some of their entries
+# ranges: {(signal index, state index): values}. The other entries of each state column are rescaled
+# proportionally so the column still sums to 1; grid points where that is impossible are NaN
+# Returns an array of shape (len(values_1), len(values_2), ..., signals, states)
+def likelihood_grid(likelihoods, ranges):
+    likelihoods = np.asarray(likelihoods, dtype=float)
+    axes = [np.asarray(values, dtype=float) for values in ranges.values()]
+    grid_shape = tuple(len(values) for values in axes)
+    grid = np.broadcast_to(likelihoods, grid_shape + likelihoods.shape).copy()
+
+    varied = np.zeros(likelihoods.shape, dtype=bool)
+    for dim, ((signal, state), values) in enumerate(zip(ranges, axes)):
+        shape = [1] * len(grid_shape)
+        shape[dim] = len(values)
+        grid[..., signal, state] = values.reshape(shape)
+        varied[signal, state] = True
+
+    # Rescale the fixed entries of every column to fill what the varied entries leave
+    fixed_sum = np.where(varied, 0.0, likelihoods).sum(axis=0)
+    leftover = 1 - np.where(varied, grid, 0.0).sum(axis=-2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scale = np.where(fixed_sum > 0, leftover / fixed_sum, np.where(np.isclose(leftover, 0), 1.0, np.nan))
+    grid = np.where(varied, grid, grid * scale[..., None, :])
+    invalid = (leftover < -1e-12) | np.isnan(scale)
+    grid[invalid.any(axis=-1)] = np.nan
+    return grid
+
+
+# Function to calculate EVSI over a whole grid of likelihood tables (..., signals, states)
+def evsi_surface(payoffs, priors, likelihood_tables):
+    return evsi(payoffs, likelihood_tables, priors)
@@ -0,0 +1,130 @@
+import numpy as np
+from decision_engine import posteriors, probability_arrays, strategy_arrays
+
+# Nodes of a decision tree. The solver gives every node a structural key built from its own data and the
+# keys of its children, so identical subtrees share one key and the rollback evaluates them only once
+# (the tree is solved as a DAG)
+
+# Leaf with a payoff
+class Terminal:
+    def __init__(self, payoff):
+        self.payoff = float(payoff)
+
+
+# Chance node: probabilities of the children
+class ChanceNode:
+    def __init__(self, name, probabilities, children):
+        self.name = name
+        self.probabilities = np.asarray(probabilities, dtype=float)
+        self.children = list(children)
+
+
+# Decision node: options {label: child}, with an optional cost per option
+class DecisionNode:
+    def __init__(self, name, options, costs=None):
+        self.name = name
+        self.labels = list(options)
+        self.children = list(options.values())
+        costs = costs or {}
+        self.costs = np.array([costs.get(label, 0.0) for label in self.labels], dtype=float)
+
+
+# Rollback solver with memoization of identical subtrees
+# The structural keys are interned to integers in a table owned by the solver, so they are freed with it
+class RollbackSolver:
+    def __init__(self):
+        self.values = {}
+        self.choices = {}
+        self.evaluated = 0
+        self.interned = {}
+        self.node_keys = {}
+
+    # Function to get the structural key of a node (computed once per node object)
+    def key(self, node):
+        entry = self.node_keys.get(id(node))
+        if entry is not None:
+            return entry[1]
+        if isinstance(node, Terminal):
+            structure = ("T", node.payoff)
+        else:
+            children = tuple(self.key(child) for child in node.children)
+            if isinstance(node, ChanceNode):
+                structure = ("C", tuple(node.probabilities), children)
+            else:
+                structure = ("D", tuple(node.labels), tuple(node.costs), children)
+        key = self.interned.setdefault(structure, len(self.interned))
+        # The node is kept with its key so its id cannot be reused while the solver lives
+        self.node_keys[id(node)] = (node, key)
+        return key
+
+    # Function to calculate the rollback value of a node
+    def value(self, node):
+        key = self.key(node)
+        if key in self.values:
+            return self.values[key]
+        self.evaluated += 1
+
+        if isinstance(node, Terminal):
+            result = node.payoff
+        else:
+            child_values = np.array([self.value(child) for child in node.children])
+            if isinstance(node, ChanceNode):
+                # Expected value over all children in one product
+                result = float(child_values @ node.probabilities)
+            else:
+                net = child_values - node.costs
+                best = int(np.argmax(net))
+                self.choices[key] = node.labels[best]
+                result = float(net[best])
+
+        self.values[key] = result
+        return result
+
+    # Function to get the optimal choice of every decision node reachable under the optimal policy
+    # Returns {path: chosen label}; the path of a decision node is the tuple of node names and branches
+    # (option label, or child index under a chance node) from the root down to it, ending with its name,
+    # so repeated sub-decisions with the same name are all reported. A node object shared by several
+    # branches is reported once, under the first path that reaches it (its choice is the same on every path)
+    def policy(self, root):
+        self.value(root)
+        decisions, seen, stack = {}, set(), [(root, ())]
+        while stack:
+            node, path = stack.pop()
+            if id(node) in seen or isinstance(node, Terminal):
+                continue
+            seen.add(id(node))
+            path += (node.name,)
+            if isinstance(node, DecisionNode):
+                label = self.choices[self.key(node)]
+                decisions[path] = label
+                stack.append((node.children[node.labels.index(label)], path + (label,)))
+            else:
+                stack.extend((child, path + (i,)) for i, child in reversed(list(enumerate(node.children))))
+        return decisions
+
+
+# Function to solve a tree: rollback value and optimal policy
+def solve(root):
+    solver = RollbackSolver()
+    return solver.value(root), solver.policy(root), solver
+
+
+# Function to build the staged decision of DecisionTree.svg for one category of qG's strategies:
+# test or not, then choose a strategy, then the market state
+def market_test_tree(options, base_probabilities, test_results, test_cost=0.0):
+    names, payoffs, _ = strategy_arrays(options)
+    _, priors, signals, likelihoods = probability_arrays(base_probabilities, test_results)
+    marginals, post = posteriors(likelihoods, priors)
+
+    # The strategy choice under given state probabilities; the state outcomes are shared terminals
+    def choose_strategy(name, probabilities):
+        return DecisionNode(name, {
+            strategy: ChanceNode("State", probabilities, [Terminal(p) for p in row])
+            for strategy, row in zip(names, payoffs)
+        })
+
+    no_test = choose_strategy("Strategy", priors)
+    with_test = ChanceNode("Test result", marginals, [
+        choose_strategy(f"Strategy after {signal}", post[m]) for m, signal in enumerate(signals)
+    ])
+    return DecisionNode("Test", {"Test": with_test, "No test": no_test}, costs={"Test": test_cost})
@@ -0,0 +1,136 @@
+import numpy as np
+
+
+# A node of the hierarchy: the goal or a (sub)criterion
+# key names the pairwise matrix / local weight vector that ranks the node's children
+# (or the alternatives, for a node without children)
+class Node:
+    def __init__(self, name, key, children=()):
+        self.name = name
+        self.key = key
+        self.children = list(children)
+
+
+# Hierarchy goal -> criteria -> ... -> alternatives of any depth and width
+# The local weight vectors are compiled into one block matrix per level, so the global
+# priorities are a chain of matrix products (batched over experts with matmul)
+class Hierarchy:
+    def __init__(self, goal, alternatives):
+        self.goal = goal
+        self.alternatives = list(alternatives)
+
+        # Nodes in breadth-first order: goal first, then each level
+        self.nodes = []
+        self.levels = []
+        level = [goal]
+        while level:
+            self.levels.append(level)
+            self.nodes.extend(level)
+            level = [child for node in level for child in node.children]
+        self.by_key = {node.key: node for node in self.nodes}
+        self.depth = len(self.levels)
+
+        # Leaves that sit above the last level are carried down with weight 1
+        self.level_members = [[self.goal]]
+        for level in self.levels[1:]:
+            carried = [n for n in self.level_members[-1] if not n.children]
+            self.level_members.append(carried + level)
+        self.leaves = list(self.level_members[-1])
+
+        # For every level transition, the (rows, col) positions each local weight vector is written to
+        # The last transition maps the leaves to the alternatives
+        self.transitions = []
+        for d, members in enumerate(self.level_members):
+            blocks, carries = [], []
+            if d + 1 == self.depth:
+                n_rows = len(self.alternatives)
+                for col, node in enumerate(members):
+                    blocks.append((node.key, np.arange(n_rows), col))
+            else:
+                next_members = self.level_members[d + 1]
+                n_rows = len(next_members)
+                position = {id(n): i for i, n in enumerate(next_members)}
+                for col, node in enumerate(members):
+                    if node.children:
+                        rows = np.array([position[id(c)] for c in node.children])
+                        blocks.append((node.key, rows, col))
+                    else:
+                        carries.append((position[id(node)], col))
+            self.transitions.append((n_rows, len(members), blocks, carries))
+
+    # Number of entries in the local weight vector of each node
+    def size(self, key):
+        node = self.by_key[key]
+        return len(node.children) if node.children else len(self.alternatives)
+
+    # Function to compile local weights (dict key -> (n,) or (B, n)) into the per-level block matrices
+    def compile(self, weights):
+        batch_shape = np.shape(weights[self.goal.key])[:-1]
+        matrices = []
+        for n_rows, n_cols, blocks, carries in self.transitions:
+            m = np.zeros(batch_shape + (n_rows, n_cols))
+            for key, rows, col in blocks:
+                m[..., rows, col] = weights[key]
+            for row, col in carries:
+                m[..., row, col] = 1.0
+            matrices.append(m)
+        return matrices
+
+    # Function to multiply the goal vector through the first n_levels block matrices
+    def _propagate(self, weights, n_levels):
+        batch_shape = np.shape(weights[self.goal.key])[:-1]
+        vector = np.ones(batch_shape + (1, 1))
+        for m in self.compile(weights)[:n_levels]:
+            vector = m @ vector
+        return vector[..., 0]
+
+    # Function to calculate the global weight of every leaf criterion (in the order of self.leaves)
+    def leaf_priorities(self, weights):
+        return self._propagate(weights, self.depth - 1)
+
+    # Function to calculate the global priorities of the alternatives
+    def global_priorities(self, weights):
+        return self._propagate(weights, self.depth)
+
+    # Function to calculate the subtree scores of every node: the priorities of the alternatives
+    # under that node alone (the goal's subtree scores are the global priorities)
+    def subtree_scores(self, weights):
+        scores = {}
+        for level in reversed(self.levels):
+            for node in level:
+                if node.children:
+                    children = np.stack([scores[child.key] for child in node.children], axis=-2)
+                    scores[node.key] = np.einsum('...i,...ia->...a', weights[node.key], children)
+                else:
+                    scores[node.key] = np.asarray(weights[node.key], dtype=float)
+        return scores
+
+    # Function to calculate the global weight of every node (the goal has weight 1)
+    def node_priorities(self, weights):
+        batch_shape = np.shape(weights[self.goal.key])[:-1]
+        priorities = {self.goal.key: np.ones(batch_shape)}
+        for node in self.nodes:
+            for i, child in enumerate(node.children):
+                priorities[child.key] = priorities[node.key] * weights[node.key][..., i]
+        return priorities
+
+
+# The hierarchy of the ΕΣΥ upgrade decision
+AHP_HIERARCHY = Hierarchy(
+    Node('Αναβάθμιση ΕΣΥ', 'criteria', [
+        Node('Οικονομικά θέματα', 'economic', [
+            Node('Κόστος ανάπτυξης', 'dev_cost'),
+            Node('Κόστος συντήρησης', 'maint_cost'),
+        ]),
+        Node('Απόδοση', 'performance', [
+            Node('Αξιοπιστία', 'reliability'),
+            Node('Ταχύτητα', 'speed'),
+            Node('Ασφάλεια δεδομένων', 'security'),
+        ]),
+        Node('Κοινωνική αποδοχή', 'social', [
+            Node('Συμβατότητα', 'compat'),
+            Node('Ευχρηστία', 'usability'),
+        ]),
+    ]),
+    alternatives=['Ιστοσελίδα', 'Mobile εφαρμογή', 'Κεντρικό σύστημα'],
+)
@@ -0,0 +1,96 @@
+import numpy as np
+from batch_ahp import ahp_batch
+from hierarchy import AHP_HIERARCHY
+
+
+# Incremental AHP for what-if sessions: editing one judgment recomputes only the weights and CR of
+# that matrix and the subtree scores of the nodes above it, instead of the whole analysis.
+# The subtree score of a node is the priority vector of the alternatives under that node alone
+# (its local weights for a leaf, the weighted sum of its children's subtree scores otherwise),
+# so the subtree score of the goal is the global priorities and an edit only has to walk up one path.
+# Usage:
+#     model = IncrementalAHP(judgment_matrices())
+#     model.set_judgment("security", 0, 1, 5)
+#     model.scores
+class IncrementalAHP:
+    # matrices: dict key -> (n, n) matrix, or (B, n, n) stack for a panel of B experts
+    def __init__(self, matrices, hierarchy=AHP_HIERARCHY, method="approximate"):
+        self.hierarchy = hierarchy
+        self.method = method
+        self.single = np.ndim(matrices[hierarchy.goal.key]) == 2
+        self.matrices = {key: np.array(m, dtype=float, ndmin=3) for key, m in matrices.items()}
+        self.n_experts = len(self.matrices[hierarchy.goal.key])
+
+        # The dependencies: each node's parent and its position among the parent's children
+        self.parent = {}
+        for node in hierarchy.nodes:
+            for i, child in enumerate(node.children):
+                self.parent[child.key] = (node.key, i)
+
+        self.refresh()
+
+    # Function to (re)compute everything from the matrices, batched over the experts
+    def refresh(self):
+        self.weights, self.crs = {}, {}
+        for node in self.hierarchy.nodes:
+            self.weights[node.key], self.crs[node.key] = ahp_batch(self.matrices[node.key], self.method)
+
+        self.subtree = self.hierarchy.subtree_scores(self.weights)
+        self.score_sum = self.subtree[self.hierarchy.goal.key].sum(axis=0)
+
+    # Function to combine the subtree scores of a node's children, for all experts or for one
+    def _subtree_scores(self, key, expert=None):
+        node = self.hierarchy.by_key[key]
+        experts = slice(None) if expert is None else expert
+        weights = self.weights[key][experts]
+        if not node.children:
+            return weights
+        children = np.stack([self.subtree[child.key][experts] for child in node.children], axis=-2)
+        return np.einsum('...i,...ia->...a', weights, children)
+
+    # Function to change the judgment (i, j) of one matrix (and its reciprocal (j, i)) of one expert
+    # Returns the keys whose weights or subtree scores were recomputed
+    def set_judgment(self, key, i, j, value, expert=0):
+        matrix = self.matrices[key][expert]
+        matrix[i, j] = value
+        matrix[j, i] = 1 / value
+        return self.update_matrix(key, expert)
+
+    # Function to recompute after the matrix of key was changed in place (e.g. several cells at once)
+    def update_matrix(self, key, expert=0):
+        goal = self.hierarchy.goal.key
+        old_scores = self.subtree[goal][expert].copy()
+
+        w, cr = ahp_batch(self.matrices[key][expert], self.method)
+        self.weights[key][expert] = w
+        self.crs[key][expert] = cr
+
+        # Propagate the change up to the goal, one node per level
+        touched = [key]
+        while True:
+            self.subtree[key][expert] = self._subtree_scores(key, expert)
+            if key not in self.parent:
+                break
+            key = self.parent[key][0]
+            touched.append(key)
+
+        self.score_sum += self.subtree[goal][expert] - old_scores
+        return touched
+
+    # Global priorities of the alternatives: of the single expert, or the mean over the panel
+    @property
+    def scores(self):
+        if self.single:
+            return self.subtree[self.hierarchy.goal.key][0]
+        return self.score_sum / self.n_experts
+
+    # Global priorities of every expert, shape (B, n_alternatives)
+    @property
+    def expert_scores(self):
+        return self.subtree[self.hierarchy.goal.key]
+
+    # Local weights and CR of one node (of the single expert, or of every expert)
+    def node_result(self, key):
+        if self.single:
+            return self.weights[key][0], self.crs[key][0]
+        return self.weights[key], self.crs[key]
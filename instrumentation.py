@@ -0,0 +1,123 @@
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+
+# The instrumentation of the running analysis, None when disabled.
+# The hooks below only check this global, so they cost nothing measurable when disabled
+_active = None
+_NULL_PHASE = contextlib.nullcontext()
+
+
+# Timer of one phase. Phases may nest (e.g. CR calculations inside matrix generation); each phase
+# is charged only its own time, so the phase times add up to the instrumented time
+class _Phase:
+    __slots__ = ("instrumentation", "name", "start", "child_time")
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.child_time = 0.0
+        self.instrumentation.stack.append(self)
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = self.instrumentation.stack
+        stack.pop()
+        if stack:
+            stack[-1].child_time += elapsed
+        self.instrumentation.add_time(self.name, elapsed - self.child_time)
+
+
+# Opt-in instrumentation of a run: wall time per phase, counters, and optionally cProfile / tracemalloc
+# Usage:
+#     with Instrumentation(profile=True) as inst:
+#         complete_ahp_analysis(n_experts=100)
+#     inst.save("report.json")
+class Instrumentation:
+    def __init__(self, profile=False, trace_memory=False, profile_top=25):
+        self.phases = {}
+        self.counters = {}
+        self.stack = []
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_top = profile_top
+        self.profiler = None
+        self.profile_stats = None
+        self.peak_memory = None
+        self.wall_time = 0.0
+
+    def add_time(self, name, seconds):
+        total, calls = self.phases.get(name, (0.0, 0))
+        self.phases[name] = (total + seconds, calls + 1)
+
+    def add_count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def __enter__(self):
+        global _active
+        self._previous = _active
+        _active = self
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        self.wall_time += time.perf_counter() - self._start
+        if self.profiler is not None:
+            self.profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(self.profile_top)
+            self.profile_stats = out.getvalue()
+        if self.trace_memory:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        _active = self._previous
+
+    # Function to export everything as a structured (JSON-serializable) report
+    def report(self):
+        report = {
+            "wall_time": self.wall_time,
+            "phases": {name: {"seconds": total, "calls": calls} for name, (total, calls) in self.phases.items()},
+            "counters": dict(self.counters),
+            "rates": {}
+        }
+        mc_time = self.phases.get("monte_carlo", (0.0, 0))[0]
+        if "samples" in self.counters and mc_time > 0:
+            report["rates"]["samples_per_second"] = self.counters["samples"] / mc_time
+        drawn = self.counters.get("accepted_draws", 0) + self.counters.get("rejected_draws", 0)
+        if drawn:
+            report["rates"]["acceptance_rate"] = self.counters.get("accepted_draws", 0) / drawn
+        if self.peak_memory is not None:
+            report["peak_memory_bytes"] = self.peak_memory
+        if self.profile_stats is not None:
+            report["profile"] = self.profile_stats
+        return report
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+# Hook: time a phase of the analysis
+def phase(name):
+    if _active is None:
+        return _NULL_PHASE
+    return _Phase(_active, name)
+
+
+# Hook: add to a counter
+def count(name, value=1):
+    if _active is not None:
+        _active.add_count(name, value)
@@ -0,0 +1,124 @@
+import json
+
+import numpy as np
+from aggregation import StreamingAggregator
+from batch_ahp import SAATY_SCALE, ahp_batch, generate_consistent_matrices, reciprocal_matrices, scale_codes
+from hierarchy import AHP_HIERARCHY
+from instrumentation import count, phase
+from saaty_table import load_table, lookup_codes
+
+# Storage type of one judgment: its index on the 17-value Saaty scale
+CODE_DTYPE = np.uint8
+
+
+# Function to find the column range of every node's upper triangle in a packed row of judgments
+# Returns {key: (start, stop, size)} and the row length
+def judgment_layout(hierarchy=AHP_HIERARCHY):
+    layout, start = {}, 0
+    for node in hierarchy.nodes:
+        size = hierarchy.size(node.key)
+        stop = start + size * (size - 1) // 2
+        layout[node.key] = (start, stop, size)
+        start = stop
+    return layout, start
+
+
+# Compact judgments of a panel of experts: only the upper triangle of every pairwise matrix,
+# as uint8 Saaty scale codes, packed in one contiguous (n_experts, row length) array.
+# One expert of AHP_HIERARCHY takes 29 bytes instead of the 712 bytes of its float64 matrices;
+# matrices are expanded to floats only for the chunk being evaluated.
+class JudgmentPanel:
+    # check=False skips the scan of every code (e.g. for a file-backed panel that should not be read up front)
+    def __init__(self, codes, hierarchy=AHP_HIERARCHY, check=True):
+        self.hierarchy = hierarchy
+        self.layout, row_length = judgment_layout(hierarchy)
+        self.codes = np.ascontiguousarray(codes, dtype=CODE_DTYPE)
+        if self.codes.ndim != 2 or self.codes.shape[1] != row_length:
+            raise ValueError(f"Judgment codes must have shape (n_experts, {row_length})")
+        if check and self.codes.size and self.codes.max() >= len(SAATY_SCALE):
+            raise ValueError("Judgment codes are not on the Saaty scale")
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    # Function to pack scale-valued matrices (dict key -> (B, n, n)) into a panel
+    @classmethod
+    def from_matrices(cls, matrices, hierarchy=AHP_HIERARCHY):
+        layout, row_length = judgment_layout(hierarchy)
+        columns = []
+        for node in hierarchy.nodes:
+            size = layout[node.key][2]
+            rows, cols = np.triu_indices(size, k=1)
+            columns.append(scale_codes(np.asarray(matrices[node.key])[..., rows, cols]))
+        return cls(np.concatenate(columns, axis=-1).reshape(-1, row_length), hierarchy)
+
+    # Function to simulate a panel of consistent experts (as ahp_analysis does), stored compactly from the start
+    @classmethod
+    def simulate(cls, n_experts, rng=None, hierarchy=AHP_HIERARCHY):
+        rng = np.random if rng is None else rng
+        layout, row_length = judgment_layout(hierarchy)
+        codes = np.empty((n_experts, row_length), dtype=CODE_DTYPE)
+        for key, (start, stop, size) in layout.items():
+            if start == stop:
+                continue
+            if size == 3:
+                table = load_table()
+                codes[:, start:stop] = table["codes"][rng.choice(table["consistent"], size=n_experts)]
+                count("table_draws", n_experts)
+            else:
+                matrices, _ = generate_consistent_matrices(size, n_experts, rng=rng)
+                rows, cols = np.triu_indices(size, k=1)
+                codes[:, start:stop] = scale_codes(matrices[:, rows, cols])
+        return cls(codes, hierarchy)
+
+    # Function to expand the matrices of one node for experts [start, stop) to (b, n, n) floats
+    def matrices(self, key, start=0, stop=None):
+        first, last, size = self.layout[key]
+        return reciprocal_matrices(SAATY_SCALE[self.codes[start:stop, first:last]], size)
+
+    # Function to calculate weights and CR of every node for experts [start, stop)
+    # 3x3 matrices with the approximate method are looked up by their codes, without expanding them
+    # The codes of the chunk are checked here, so a panel opened with check=False still rejects corrupt codes
+    def evaluate(self, start=0, stop=None, method="approximate"):
+        chunk = self.codes[start:stop]
+        if chunk.size and chunk.max() >= len(SAATY_SCALE):
+            raise ValueError("Judgment codes are not on the Saaty scale")
+        weights, crs = {}, {}
+        for key, (first, last, size) in self.layout.items():
+            if size == 3 and method == "approximate":
+                weights[key], crs[key] = lookup_codes(chunk[:, first:last])
+            else:
+                with phase("matrix_generation"):
+                    matrices = self.matrices(key, start, stop)
+                weights[key], crs[key] = ahp_batch(matrices, method)
+        with phase("scoring"):
+            scores = self.hierarchy.global_priorities(weights)
+        return {"weights": weights, "crs": crs, "scores": scores}
+
+    # Function to evaluate the whole panel chunk by chunk into a streaming aggregator
+    def aggregate(self, chunk_size=100000, method="approximate", aggregator=None):
+        aggregator = StreamingAggregator() if aggregator is None else aggregator
+        for start in range(0, len(self), chunk_size):
+            result = self.evaluate(start, start + chunk_size, method)
+            with phase("aggregation"):
+                aggregator.update_batch(result)
+        return aggregator
+
+    # Function to save the panel: the packed codes plus the node keys and sizes they were packed for
+    def save(self, path):
+        meta = [[key, size] for key, (_, _, size) in self.layout.items()]
+        np.savez(path, codes=self.codes, layout=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path, hierarchy=AHP_HIERARCHY):
+        with np.load(path) as data:
+            codes = data["codes"]
+            meta = json.loads(str(data["layout"]))
+        expected = [[key, size] for key, (_, _, size) in judgment_layout(hierarchy)[0].items()]
+        if meta != expected:
+            raise ValueError("Saved panel was packed for another hierarchy")
+        return cls(codes, hierarchy)
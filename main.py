@@ -1,4 +1,6 @@
 import numpy as np
+from hierarchy import AHP_HIERARCHY
+from random_index import random_index
 
 #Calculate weights
 def calculate_weights(matrix):
@@ -15,23 +17,14 @@ def calculate_cr(matrix):
     l_max = np.mean(weighted_sum / weights)
 
     CI = (l_max - n) / (n - 1)
-    RI = {3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45}.get(n, 0.58)
+    RI = random_index(n)
     CR = CI / RI if RI != 0 else 0.0
 
     return CR
 
 
-def ahp_analysis():
-
-    criteria = ['Οικονομικά θέματα', 'Απόδοση', 'Κοινωνική αποδοχή']
-    subcriteria = {
-        'Οικονομικά θέματα': ['Κόστος ανάπτυξης', 'Κόστος συντήρησης'],
-        'Απόδοση': ['Αξιοπιστία', 'Ταχύτητα', 'Ασφάλεια δεδομένων'],
-        'Κοινωνική αποδοχή': ['Συμβατότητα', 'Ευχρηστία']
-    }
-    alternatives = ['Ιστοσελίδα', 'Mobile εφαρμογή', 'Κεντρικό σύστημα']
-
-    # Matrix declaration
+# The pairwise comparison matrices of the analysis, keyed like the nodes of AHP_HIERARCHY
+def judgment_matrices():
     criteria_matrix = np.array([[1, 1 / 3, 1 / 2], [3, 1, 2], [2, 1 / 2, 1]])
 
     economic_matrix = np.array([[1, 1 / 2], [2, 1]])
@@ -46,32 +39,65 @@ def ahp_analysis():
     compat_matrix = np.array([[1, 2, 3], [1 / 2, 1, 2], [1 / 3, 1 / 2, 1]])
     usability_matrix = np.array([[1, 1 / 3, 1 / 5], [3, 1, 1 / 2], [5, 2, 1]])
 
+    return {
+        "criteria": criteria_matrix,
+        "economic": economic_matrix,
+        "performance": performance_matrix,
+        "social": social_matrix,
+        "dev_cost": dev_cost_matrix,
+        "maint_cost": maint_cost_matrix,
+        "reliability": reliability_matrix,
+        "speed": speed_matrix,
+        "security": security_matrix,
+        "compat": compat_matrix,
+        "usability": usability_matrix
+    }
+
+
+def ahp_analysis():
+
+    criteria = ['Οικονομικά θέματα', 'Απόδοση', 'Κοινωνική αποδοχή']
+    subcriteria = {
+        'Οικονομικά θέματα': ['Κόστος ανάπτυξης', 'Κόστος συντήρησης'],
+        'Απόδοση': ['Αξιοπιστία', 'Ταχύτητα', 'Ασφάλεια δεδομένων'],
+        'Κοινωνική αποδοχή': ['Συμβατότητα', 'Ευχρηστία']
+    }
+    alternatives = ['Ιστοσελίδα', 'Mobile εφαρμογή', 'Κεντρικό σύστημα']
+
     # Weights and CR calculation
-    criteria_weights = calculate_weights(criteria_matrix)
-    cr_criteria = calculate_cr(criteria_matrix)
-
-    economic_weights = calculate_weights(economic_matrix)
-    cr_economic = calculate_cr(economic_matrix)
-    performance_weights = calculate_weights(performance_matrix)
-    cr_performance = calculate_cr(performance_matrix)
-    social_weights = calculate_weights(social_matrix)
-    cr_social = calculate_cr(social_matrix)
-
-    dev_cost_weights = calculate_weights(dev_cost_matrix)
-    maint_cost_weights = calculate_weights(maint_cost_matrix)
-    reliability_weights = calculate_weights(reliability_matrix)
-    speed_weights = calculate_weights(speed_matrix)
-    security_weights = calculate_weights(security_matrix)
-    compat_weights = calculate_weights(compat_matrix)
-    usability_weights = calculate_weights(usability_matrix)
+    matrices = judgment_matrices()
+    criteria_weights = calculate_weights(matrices["criteria"])
+    cr_criteria = calculate_cr(matrices["criteria"])
+
+    economic_weights = calculate_weights(matrices["economic"])
+    cr_economic = calculate_cr(matrices["economic"])
+    performance_weights = calculate_weights(matrices["performance"])
+    cr_performance = calculate_cr(matrices["performance"])
+    social_weights = calculate_weights(matrices["social"])
+    cr_social = calculate_cr(matrices["social"])
+
+    dev_cost_weights = calculate_weights(matrices["dev_cost"])
+    maint_cost_weights = calculate_weights(matrices["maint_cost"])
+    reliability_weights = calculate_weights(matrices["reliability"])
+    speed_weights = calculate_weights(matrices["speed"])
+    security_weights = calculate_weights(matrices["security"])
+    compat_weights = calculate_weights(matrices["compat"])
+    usability_weights = calculate_weights(matrices["usability"])
 
     # Alternatives score calculation
-    alternative_scores = np.zeros(3)
-    for i in range(3):
-        economic = criteria_weights[0] * (economic_weights[0] * dev_cost_weights[i] + economic_weights[1] * maint_cost_weights[i])
-        performance = criteria_weights[1] * (performance_weights[0] * reliability_weights[i] + performance_weights[1] * speed_weights[i] + performance_weights[2] * security_weights[i])
-        social = criteria_weights[2] * (social_weights[0] * compat_weights[i] + social_weights[1] * usability_weights[i])
-        alternative_scores[i] = economic + performance + social
+    alternative_scores = AHP_HIERARCHY.global_priorities({
+        "criteria": criteria_weights,
+        "economic": economic_weights,
+        "performance": performance_weights,
+        "social": social_weights,
+        "dev_cost": dev_cost_weights,
+        "maint_cost": maint_cost_weights,
+        "reliability": reliability_weights,
+        "speed": speed_weights,
+        "security": security_weights,
+        "compat": compat_weights,
+        "usability": usability_weights
+    })
 
     # Results
     print("1. ΒΑΡΗ ΚΡΙΤΗΡΙΩΝ:")
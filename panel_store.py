@@ -0,0 +1,134 @@
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+from batch_ahp import SAATY_SCALE
+from hierarchy import AHP_HIERARCHY
+from judgment_store import CODE_DTYPE, JudgmentPanel, judgment_layout
+
+# File-backed expert panels. Layout of a panel file:
+#     MAGIC (8 bytes) | header length (uint32, little endian) | JSON header, padded to HEADER_ALIGN bytes
+#     | judgment codes: n_experts rows of the packed JudgmentPanel layout, uint8, row-major
+# The header describes the hierarchy the rows were packed for, so a panel is opened with np.memmap
+# (no parse step) and scored in fixed-size chunks of zero-copy views with bounded memory.
+MAGIC = b"AHPPANEL"
+VERSION = 1
+HEADER_ALIGN = 64
+
+
+# Function to describe a hierarchy in the header: node keys and sizes in packing order, plus names
+def panel_header(n_experts, hierarchy=AHP_HIERARCHY):
+    layout, row_length = judgment_layout(hierarchy)
+    return {
+        "version": VERSION,
+        "n_experts": n_experts,
+        "row_length": row_length,
+        "dtype": np.dtype(CODE_DTYPE).str,
+        "scale": SAATY_SCALE.tolist(),
+        "layout": [[key, size] for key, (_, _, size) in layout.items()],
+        "nodes": {node.key: node.name for node in hierarchy.nodes},
+        "alternatives": hierarchy.alternatives
+    }
+
+
+# Function to encode a header, padded with spaces to size bytes
+# (by default so that the codes start at a multiple of HEADER_ALIGN)
+def _encode_header(header, size=None):
+    payload = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    if size is None:
+        size = len(MAGIC) + 4 + len(payload)
+        size += -size % HEADER_ALIGN
+    payload += b" " * (size - len(MAGIC) - 4 - len(payload))
+    return MAGIC + struct.pack("<I", len(payload)) + payload
+
+
+# Function to read the header of a panel file; returns the header and the offset of the codes
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a panel file")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("version") != VERSION:
+        raise ValueError(f"Unsupported panel file version: {header.get('version')}")
+    return header, len(MAGIC) + 4 + length
+
+
+# Appends expert judgments to a new panel file chunk by chunk; the expert count in the header is
+# written on close. The rows go to a unique temporary file next to path, moved over path on close,
+# so writers of the same path never share a file. Usage:
+#     with PanelWriter("panel.ahp") as writer:
+#         for chunk in survey_chunks:
+#             writer.append(JudgmentPanel.from_matrices(chunk))
+class PanelWriter:
+    def __init__(self, path, hierarchy=AHP_HIERARCHY):
+        self.path = path
+        self.hierarchy = hierarchy
+        self.n_experts = 0
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+        self.file = os.fdopen(fd, "wb")
+        # Placeholder header of the final size: the count is rewritten in place on close
+        self.header_size = len(_encode_header(panel_header(2**63 - 1, hierarchy)))
+        self.file.write(b"\0" * self.header_size)
+
+    # Function to append a JudgmentPanel (or packed (B, row length) codes)
+    def append(self, panel):
+        codes = panel.codes if isinstance(panel, JudgmentPanel) else JudgmentPanel(panel, self.hierarchy).codes
+        self.file.write(codes.tobytes())
+        self.n_experts += len(codes)
+
+    def close(self):
+        # Padded to the reserved size, so the codes stay where they were written
+        self.file.seek(0)
+        self.file.write(_encode_header(panel_header(self.n_experts, self.hierarchy), self.header_size))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+            os.remove(self.tmp_path)
+
+
+# Function to write a whole in-memory panel to a file
+def save_panel(path, panel):
+    with PanelWriter(path, panel.hierarchy) as writer:
+        writer.append(panel)
+
+
+# Function to open a panel file as a JudgmentPanel backed by np.memmap; nothing is read until evaluated
+def open_panel(path, hierarchy=AHP_HIERARCHY):
+    header, offset = read_header(path)
+    expected = panel_header(header["n_experts"], hierarchy)
+    for field in ("row_length", "dtype", "scale", "layout"):
+        if header[field] != expected[field]:
+            raise ValueError(f"Panel file {path} was written for another hierarchy or scale ({field})")
+
+    shape = (header["n_experts"], header["row_length"])
+    if shape[0] == 0:
+        return JudgmentPanel(np.empty(shape, dtype=CODE_DTYPE), hierarchy)
+    codes = np.memmap(path, dtype=CODE_DTYPE, mode="r", offset=offset, shape=shape)
+    return JudgmentPanel(codes, hierarchy, check=False)
+
+
+# Function to score a panel file in chunks of chunk_size experts with streaming aggregation
+# Returns the aggregated results in the form of complete_ahp_analysis
+def score_panel(path, chunk_size=100000, method="approximate", aggregation="arithmetic", hierarchy=AHP_HIERARCHY):
+    panel = open_panel(path, hierarchy)
+    if len(panel) == 0:
+        raise ValueError(f"Panel file {path} has no experts to score")
+    aggregator = panel.aggregate(chunk_size, method)
+    return {
+        "criteria_weights": aggregator.aggregate(hierarchy.goal.key, aggregation),
+        "subcriteria_weights": {
+            node.name: aggregator.aggregate(node.key, aggregation) for node in hierarchy.goal.children
+        },
+        "alternative_scores": aggregator.aggregate("scores", aggregation)
+    }
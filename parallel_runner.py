@@ -0,0 +1,82 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from aggregation import StreamingAggregator
+from ahp_analysis import simulate_experts
+from hierarchy import AHP_HIERARCHY
+from random_index import random_index
+from saaty_table import load_table
+from sensitivity_analysis import prr_vectorized
+
+# Experts simulated per batched call inside a shard
+EXPERT_CHUNK = 10000
+
+
+# Function to split a sample budget over n_shards as evenly as possible
+def split_budget(total, n_shards):
+    base, extra = divmod(total, n_shards)
+    return [base + (1 if i < extra else 0) for i in range(n_shards)]
+
+
+# Function to run shard jobs, inline for one worker or on a process pool
+# Shards are always returned in submission order, so merging them is deterministic
+def run_shards(func, jobs, workers):
+    if workers == 1:
+        return [func(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, jobs))
+
+
+# Shard of the expert simulation: a streaming aggregator over its experts
+def _expert_shard(job):
+    n_experts, seed_seq = job
+    rng = np.random.default_rng(seed_seq)
+    aggregator = StreamingAggregator()
+    for start in range(0, n_experts, EXPERT_CHUNK):
+        aggregator.update_batch(simulate_experts(min(EXPERT_CHUNK, n_experts - start), rng))
+    return aggregator
+
+
+# Expert simulation of complete_ahp_analysis split over a process pool
+# Each shard gets its own generator spawned from the root seed
+def parallel_expert_simulation(n_experts, seed=0, workers=4, aggregation="arithmetic"):
+    # Build the on-disk tables once here, so the workers load them instead of all building them at once
+    load_table()
+    for node in AHP_HIERARCHY.nodes:
+        random_index(AHP_HIERARCHY.size(node.key))
+    seed_seqs = np.random.SeedSequence(seed).spawn(workers)
+    jobs = [(n, seq) for n, seq in zip(split_budget(n_experts, workers), seed_seqs) if n > 0]
+
+    # Merge the shard aggregators
+    aggregator = StreamingAggregator()
+    for shard in run_shards(_expert_shard, jobs, workers):
+        aggregator.merge(shard)
+
+    return {
+        "criteria_weights": aggregator.aggregate("criteria", aggregation),
+        "subcriteria_weights": {
+            node.name: aggregator.aggregate(node.key, aggregation) for node in AHP_HIERARCHY.goal.children
+        },
+        "alternative_scores": aggregator.aggregate("scores", aggregation)
+    }
+
+
+# Shard of the PRR study: rank reversal counts for its share of samples
+def _prr_shard(job):
+    original_scores, s_values, n, seed_seq = job
+    rng = np.random.default_rng(seed_seq)
+    return prr_vectorized(original_scores, s_values, n, rng) * n
+
+
+# PRR study of parallel_perturbation_analysis split over a process pool
+def parallel_prr(original_scores, s_values, N, seed=0, workers=4):
+    seed_seqs = np.random.SeedSequence(seed).spawn(workers)
+    jobs = [(original_scores, s_values, n, seq)
+            for n, seq in zip(split_budget(N, workers), seed_seqs) if n > 0]
+    counts = run_shards(_prr_shard, jobs, workers)
+    return sum(counts) / N
+
+
+if __name__ == "__main__":
+    print(parallel_expert_simulation(n_experts=100000, seed=0, workers=4))
+    print(parallel_prr(np.array([0.3903, 0.2943, 0.3154]), np.arange(0.2, 0.7, 0.1), N=1000000, seed=0, workers=4))
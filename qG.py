@@ -1,203 +1,194 @@
-import matplotlib.pyplot as plt
 import numpy as np
+from decision_engine import (break_even_probabilities, emv, ev_with_perfect_information, evsi, evsi_surface,
+                             likelihood_grid, probability_arrays, probability_grid, strategy_arrays)
 
 def calculate_emv(strategies):
     emv_results = {}
     print("\nEMV results\n")
     for category, options in strategies.items():
         print(category)
-        emv_results[category] = {}
-        for name, data in options.items():
-            expected_value = sum(prob * result for prob, result in data["results"])
-            emv = expected_value - data["cost"]
-            emv_results[category][name] = emv
-            print(f"{name}: EMV = {emv:.2f}€")
+        names, payoffs, probabilities = strategy_arrays(options)
+        emv_results[category] = dict(zip(names, emv(payoffs, probabilities)))
+        for name, value in emv_results[category].items():
+            print(f"{name}: EMV = {value:.2f}€")
     return emv_results
 
 def calculate_evpi(strategies, emv_results):
     print("\nEVPI results\n")
     for category, options in strategies.items():
-        probabilities = [p for p, r in next(iter(options.values()))["results"]]
-        payoffs_per_state = []
-        for i in range(len(probabilities)):
-            payoffs_state_i = []
-            for name, data in options.items():
-                payoff = data["results"][i][1] - data["cost"]
-                payoffs_state_i.append(payoff)
-            payoffs_per_state.append(payoffs_state_i)
-        max_payoffs_per_state = [max(payoffs) for payoffs in payoffs_per_state]
-        Evwpi = sum(p * payoff for p, payoff in zip(probabilities, max_payoffs_per_state))
-        max_emv = max(emv_results[category].values())
-        EVPI = Evwpi - max_emv
+        _, payoffs, probabilities = strategy_arrays(options)
+        # The best EMV is taken from the results of calculate_emv
+        EVPI = ev_with_perfect_information(payoffs, probabilities) - max(emv_results[category].values())
         print(f"{category}: EVPI = {EVPI:.2f}€")
 
+# Any number of states and test outcomes: the states are read from base_probabilities ("P(Y)")
+# and the outcomes from test_results ("P(Theta/Y)")
 def calculate_evsi(strategies, base_probabilities, test_results):
     print("\nEVSI results\n")
-
-    # Probabilities for test outcomes
-    P_Theta = test_results["P(Theta/Y)"] * base_probabilities["P(Y)"] + test_results["P(Theta/X)"] * base_probabilities["P(X)"]
-    P_I = test_results["P(I/Y)"] * base_probabilities["P(Y)"] + test_results["P(I/X)"] * base_probabilities["P(X)"]
-    P_A = test_results["P(A/Y)"] * base_probabilities["P(Y)"] + test_results["P(A/X)"] * base_probabilities["P(X)"]
-
-    posterior = {
-        "P(Y/Theta)": (test_results["P(Theta/Y)"] * base_probabilities["P(Y)"]) / P_Theta,
-        "P(X/Theta)": (test_results["P(Theta/X)"] * base_probabilities["P(X)"]) / P_Theta,
-        "P(Y/I)": (test_results["P(I/Y)"] * base_probabilities["P(Y)"]) / P_I,
-        "P(X/I)": (test_results["P(I/X)"] * base_probabilities["P(X)"]) / P_I,
-        "P(Y/A)": (test_results["P(A/Y)"] * base_probabilities["P(Y)"]) / P_A,
-        "P(X/A)": (test_results["P(A/X)"] * base_probabilities["P(X)"]) / P_A,
-    }
+    _, priors, _, likelihoods = probability_arrays(base_probabilities, test_results)
 
     # EVSI for each category
     for category, options in strategies.items():
+        _, payoffs, _ = strategy_arrays(options)
+        EVSI = evsi(payoffs, likelihoods, priors)
+        print(f"{category}: EVSI = {EVSI:.2f}€")
 
-        # EMV for each test result
-        emv_test_results = {"Theta": {}, "I": {}, "A": {}}
-
-        # For each test result, calculate the best EMV using posterior probabilities
-        for test_result in ["Theta", "I", "A"]:
-            p_Y = posterior[f"P(Y/{test_result})"]
-            p_X = posterior[f"P(X/{test_result})"]
-
-            for name, data in options.items():
-                payoff_Y = data["results"][0][1] - data["cost"]
-                payoff_X = data["results"][1][1] - data["cost"]
-                # Updated EMV
-                emv = p_Y * payoff_Y + p_X * payoff_X
-                emv_test_results[test_result][name] = emv
-
-        # Find best option for each test result
-        best_emv_per_test_result = {
-            "Theta": max(emv_test_results["Theta"].values()),
-            "I": max(emv_test_results["I"].values()),
-            "A": max(emv_test_results["A"].values())
-        }
 
-        # Calculate EVSI
-        EVSI = (P_Theta * best_emv_per_test_result["Theta"] +
-                P_I * best_emv_per_test_result["I"] +
-                P_A * best_emv_per_test_result["A"]) - max(emv_results[category].values())
+# EVSI as a function of the test's accuracy, for every category, without printing
+# ranges: {"P(Theta/Y)": values, ...} for the likelihoods to vary; the other likelihoods of the same
+# state are rescaled proportionally. The test is worth buying up to its break-even price, the EVSI
+def calculate_evsi_surface(strategies, base_probabilities, test_results, ranges, test_price=None):
+    states, priors, signals, likelihoods = probability_arrays(base_probabilities, test_results)
+    positions = {}
+    for key, values in ranges.items():
+        signal, state = key[2:-1].split("/")
+        positions[signals.index(signal), states.index(state)] = values
+    tables = likelihood_grid(likelihoods, positions)
 
-        print(f"{category}: EVSI = {EVSI:.2f}€")
+    surfaces = {}
+    for category, options in strategies.items():
+        _, payoffs, _ = strategy_arrays(options)
+        surface = evsi_surface(payoffs, priors, tables)
+        surfaces[category] = {
+            "axes": {key: np.asarray(values) for key, values in ranges.items()},
+            "evsi": surface,
+            "break_even_price": np.maximum(surface, 0.0)
+        }
+        if test_price is not None:
+            surfaces[category]["worth_buying"] = surface > test_price
+    return surfaces
 
 
 def sensitivity_analysis(strategies, base_prob, variations=[-0.10, 0, +0.10]):
     print("\nSensitivity Analysis")
+    original_p = base_prob["P(Y)"]
+    priors = np.array([original_p, 1 - original_p])
+    p_values = [original_p + (variation * original_p) for variation in variations]
+    prior_grid = probability_grid(priors, p_values)
+
     for category, options in strategies.items():
         print(f"\n{category}")
-        original_p = base_prob["P(Y)"]
-        for variation in variations:
-            new_p = original_p + (variation * original_p)
-            new_p_X = 1 - new_p
-            print(f"\nP(Y) = {new_p:.2f}, P(X) = {new_p_X:.2f}")
-
-            best_emv = -float('inf')
-            best_strategy = None
-
-            for name, data in options.items():
-                # Calculate EMV with new probabilities
-                payoff_Y = data["results"][0][1] - data["cost"]
-                payoff_X = data["results"][1][1] - data["cost"]
-                emv = new_p * payoff_Y + new_p_X * payoff_X
-
-                print(f"{name}: EMV = {emv:.2f}€")
+        names, payoffs, _ = strategy_arrays(options)
 
-                if emv > best_emv:
-                    best_emv = emv
-                    best_strategy = name
+        # EMV of every strategy for every variation in one call
+        emvs = emv(payoffs, prior_grid)
+        for (new_p, new_p_X), row in zip(prior_grid, emvs):
+            print(f"\nP(Y) = {new_p:.2f}, P(X) = {new_p_X:.2f}")
+            for name, value in zip(names, row):
+                print(f"{name}: EMV = {value:.2f}€")
+            best = np.argmax(row)
+            print(f"Best strategy: {names[best]} (EMV = {row[best]:.2f}€)")
 
-            print(f"Best strategy: {best_strategy} (EMV = {best_emv:.2f}€)")
+        # Exact probabilities where the optimal strategy changes
+        points, best = break_even_probabilities(payoffs, priors)
+        if len(points) == 0:
+            print(f"\n{names[best[0]]} is optimal for every P(Y)")
+        for p, before, after in zip(points, best[:-1], best[1:]):
+            print(f"\nBreak-even at P(Y) = {p:.4f}: {names[before]} -> {names[after]}")
 
 
-def plot_sensitivity_results(strategies, base_prob):
+# Data of the EMV lines of every category over P(Y) +-10%
+def sensitivity_plot_data(strategies, base_prob):
     # Probability range +-10%
     p_Y_values = np.linspace(base_prob["P(Y)"] * 0.9,
                              base_prob["P(Y)"] * 1.1,
                              100)
+    priors = np.array([base_prob["P(Y)"], 1 - base_prob["P(Y)"]])
+    prior_grid = probability_grid(priors, p_Y_values)
 
-    # Create a figure for each category
+    data = []
     for category, options in strategies.items():
-        plt.figure(figsize=(10, 6))
-
-        # Calculate EMV for each strategy across P(Y) range
-        for strategy_name, data in options.items():
-            emvs = []
-            for p_Y in p_Y_values:
-                p_X = 1 - p_Y
-                payoff_Y = data["results"][0][1] - data["cost"]
-                payoff_X = data["results"][1][1] - data["cost"]
-                emv = p_Y * payoff_Y + p_X * payoff_X
-                emvs.append(emv)
-
-            # Plot the strategy's EMV curve
-            plt.plot(p_Y_values, emvs,
-                     label=strategy_name,
-                     linewidth=2)
-
-        plt.title(f"Sensitivity Analysis: {category}")
-        plt.xlabel("Probability")
-        plt.ylabel("EMV")
-        plt.axvline(x=base_prob["P(Y)"], color='gray', linestyle='--',
-                    label='Base Probability')
-        plt.grid(True)
-        plt.legend()
+        # EMV for each strategy across the whole P(Y) range in one call
+        names, payoffs, _ = strategy_arrays(options)
+        data.append({"category": category, "names": names, "p_Y_values": p_Y_values,
+                     "emvs": emv(payoffs, prior_grid), "base_p": base_prob["P(Y)"]})
+    return data
+
+
+# Draws the EMV lines of one category on a new figure, without showing it
+def draw_emv_lines(data):
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(10, 6))
+
+    # Plot each strategy's EMV curve
+    for strategy_name, strategy_emvs in zip(data["names"], data["emvs"].T):
+        plt.plot(data["p_Y_values"], strategy_emvs,
+                 label=strategy_name,
+                 linewidth=2)
+
+    plt.title(f"Sensitivity Analysis: {data['category']}")
+    plt.xlabel("Probability")
+    plt.ylabel("EMV")
+    plt.axvline(x=data["base_p"], color='gray', linestyle='--',
+                label='Base Probability')
+    plt.grid(True)
+    plt.legend()
+
+
+def plot_sensitivity_results(strategies, base_prob):
+    import matplotlib.pyplot as plt
+    # Create a figure for each category
+    for data in sensitivity_plot_data(strategies, base_prob):
+        draw_emv_lines(data)
         plt.show()
 
-if __name__ == '__main__':
-    strategies = {
-        "Marketing":{
-            "Επιθετικό":{
-                "cost": 70000,
-                "results": [(0.6, 220000), (0.4, 100000)]
-            },
-            "Μέτριο":{
-                "cost": 40000,
-                "results": [(0.6, 120000), (0.4, 60000)]
-            },
-            "Συντηρητικό":{
-                "cost": 25000,
-                "results": [(0.6, 100000), (0.4, 50000)]
-            }
+# Strategies of each category, market state probabilities and market test likelihoods
+STRATEGIES = {
+    "Marketing":{
+        "Επιθετικό":{
+            "cost": 70000,
+            "results": [(0.6, 220000), (0.4, 100000)]
         },
-        "Investment":{
-            "Υψηλό":{
-                "cost": 100000,
-                "results": [(0.6, 250000), (0.4, 40000)]
-            },
-            "Χαμηλό":{
-                "cost": 30000,
-                "results": [(0.6, 50000), (0.4, -20000)]
-            }
+        "Μέτριο":{
+            "cost": 40000,
+            "results": [(0.6, 120000), (0.4, 60000)]
         },
-        "Supply":{
-            "Ακριβά υλικά":{
-                "cost": 70000,
-                "results": [(0.6, 165000), (0.4, 40000)]
-            },
-            "Φτηνά υλικά":{
-                "cost": 30000,
-                "results": [(0.6, 120000), (0.4, 20000)]
-            }
+        "Συντηρητικό":{
+            "cost": 25000,
+            "results": [(0.6, 100000), (0.4, 50000)]
+        }
+    },
+    "Investment":{
+        "Υψηλό":{
+            "cost": 100000,
+            "results": [(0.6, 250000), (0.4, 40000)]
+        },
+        "Χαμηλό":{
+            "cost": 30000,
+            "results": [(0.6, 50000), (0.4, -20000)]
+        }
+    },
+    "Supply":{
+        "Ακριβά υλικά":{
+            "cost": 70000,
+            "results": [(0.6, 165000), (0.4, 40000)]
+        },
+        "Φτηνά υλικά":{
+            "cost": 30000,
+            "results": [(0.6, 120000), (0.4, 20000)]
         }
     }
+}
 
-    base_probabilities = {
-        "P(Y)": 0.6,
-        "P(X)": 0.4
-    }
+BASE_PROBABILITIES = {
+    "P(Y)": 0.6,
+    "P(X)": 0.4
+}
 
-    test_results = {
-        "P(Theta/Y)": 0.50,
-        "P(I/Y)": 0.25,
-        "P(A/Y)": 0.25,
-        "P(Theta/X)": 0.20,
-        "P(I/X)": 0.25,
-        "P(A/X)": 0.55
-    }
+TEST_RESULTS = {
+    "P(Theta/Y)": 0.50,
+    "P(I/Y)": 0.25,
+    "P(A/Y)": 0.25,
+    "P(Theta/X)": 0.20,
+    "P(I/X)": 0.25,
+    "P(A/X)": 0.55
+}
 
-    emv_results = calculate_emv(strategies)
-    calculate_evpi(strategies, emv_results)
-    calculate_evsi(strategies, base_probabilities, test_results)
+
+if __name__ == '__main__':
+    emv_results = calculate_emv(STRATEGIES)
+    calculate_evpi(STRATEGIES, emv_results)
+    calculate_evsi(STRATEGIES, BASE_PROBABILITIES, TEST_RESULTS)
     base_prob = {"P(Y)": 0.6, "P(X)": 0.4}
-    sensitivity_analysis(strategies, base_prob)
-    #plot_sensitivity_results(strategies, base_prob)
\ No newline at end of file
+    sensitivity_analysis(STRATEGIES, base_prob)
+    #plot_sensitivity_results(STRATEGIES, base_prob)
\ No newline at end of file
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+from batch_ahp import CACHE_DIR, RANDOM_INDEX, generate_random_matrices, power_iteration_batch
+
+# Persistent cache of estimated random indices
+RI_CACHE_PATH = os.path.join(CACHE_DIR, "random_index.json")
+_cache = None
+
+
+# Function to estimate RI for n x n matrices: mean CI of random reciprocal matrices on the Saaty scale
+# Returns the estimate and its 95% confidence interval
+def estimate_random_index(n, samples=100000, chunk_size=10000, rng=None):
+    if n <= 2:
+        return {"ri": 0.0, "ci_low": 0.0, "ci_high": 0.0, "samples": 0}
+    rng = np.random.default_rng() if rng is None else rng
+
+    # Running sum and sum of squares of the CI over the chunks
+    total, total_sq = 0.0, 0.0
+    for start in range(0, samples, chunk_size):
+        count = min(chunk_size, samples - start)
+        _, l_max = power_iteration_batch(generate_random_matrices(n, count, rng))
+        ci = (l_max - n) / (n - 1)
+        total += ci.sum()
+        total_sq += (ci ** 2).sum()
+
+    mean = total / samples
+    std_error = np.sqrt(max(total_sq / samples - mean ** 2, 0.0) / samples)
+    return {"ri": float(mean), "ci_low": float(mean - 1.96 * std_error),
+            "ci_high": float(mean + 1.96 * std_error), "samples": samples}
+
+
+# Function to read the cache file (empty if missing or unreadable)
+def _read_cache():
+    try:
+        with open(RI_CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Function to load the cache file once per process
+def load_cache():
+    global _cache
+    if _cache is None:
+        _cache = _read_cache()
+    return _cache
+
+
+# Function to write an estimate to the cache file
+# The file is re-read first (to keep estimates other processes saved meanwhile) and written under a
+# unique temporary name, so processes saving at the same time never write the same file
+def save_estimate(n, estimate):
+    cache = load_cache()
+    for key, entry in _read_cache().items():
+        if entry.get("samples", 0) > cache.get(key, {}).get("samples", 0):
+            cache[key] = entry
+    cache[str(n)] = estimate
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, RI_CACHE_PATH)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Function to get RI for any n: Saaty's values for n <= 9, cached estimates above that
+# An estimate is simulated again when more samples are asked for than it was made with
+def random_index(n, samples=100000, seed=0):
+    if n in RANDOM_INDEX:
+        return RANDOM_INDEX[n]
+
+    cache = load_cache()
+    entry = cache.get(str(n))
+    if entry is None or entry.get("samples", 0) < samples:
+        estimate = estimate_random_index(n, samples, rng=np.random.default_rng(seed))
+        estimate["seed"] = seed
+        save_estimate(n, estimate)
+    return cache[str(n)]["ri"]
+
+
+if __name__ == "__main__":
+    for n in range(3, 21):
+        if n in RANDOM_INDEX:
+            print(f"n={n}: RI = {RANDOM_INDEX[n]:.4f} (Saaty)")
+        else:
+            random_index(n)
+            est = load_cache()[str(n)]
+            print(f"n={n}: RI = {est['ri']:.4f} [{est['ci_low']:.4f}, {est['ci_high']:.4f}]")
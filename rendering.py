@@ -0,0 +1,150 @@
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")  # Non-interactive backend: figures are only written to files
+
+import numpy as np
+from qG import BASE_PROBABILITIES, STRATEGIES, sensitivity_plot_data
+from result_cache import cached_ahp_analysis
+from sensitivity_analysis import parallel_perturbation_analysis
+from visualization import FIGURES
+
+MANIFEST_NAME = ".render_manifest.json"
+
+
+# One figure to render: name of the output file, the drawing function as "module:function"
+# (it must draw on a new figure, see e.g. visualization.FIGURES) and the data passed to it
+class FigureJob:
+    def __init__(self, name, draw, data):
+        self.name = name
+        self.draw = draw
+        self.data = data
+
+
+# Function to hash the input of a job, so unchanged figures can be skipped
+def _digest(value, digest):
+    if isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=str):
+            _digest(key, digest)
+            _digest(value[key], digest)
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _digest(item, digest)
+        digest.update(b"]")
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode("utf-8"))
+
+
+# Function to read the source file of the module of a "module:function" drawing function
+# The whole module is hashed, so edits to the helpers a chart calls also re-render it
+def _module_source(draw):
+    module = importlib.import_module(draw.split(":")[0])
+    with open(inspect.getsourcefile(module), "rb") as f:
+        return f.read()
+
+
+def job_hash(job, fmt):
+    digest = hashlib.sha256()
+    _digest([job.draw, _module_source(job.draw), fmt, job.data], digest)
+    return digest.hexdigest()
+
+
+def _init_worker():
+    matplotlib.use("Agg", force=True)
+
+
+# Function to render one job to its file (runs in a worker process)
+def _render(task):
+    job, path, fmt = task
+    import matplotlib.pyplot as plt
+    module, function = job.draw.split(":")
+    getattr(importlib.import_module(module), function)(job.data)
+    plt.savefig(path, format=fmt)
+    plt.close("all")
+    return job.name, path
+
+
+# Function to render figure jobs in parallel worker processes straight to PNG/SVG files
+# Figures whose input data, drawing function and format have not changed since the last run are skipped
+# Returns {name: path} of the rendered figures and the list of skipped names
+def render_figures(jobs, output_dir, fmt="png", workers=None, force=False):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    tasks, skipped, hashes = [], [], {}
+    for job in jobs:
+        path = os.path.join(output_dir, f"{job.name}.{fmt}")
+        hashes[job.name] = job_hash(job, fmt)
+        if not force and manifest.get(job.name) == hashes[job.name] and os.path.exists(path):
+            skipped.append(job.name)
+        else:
+            tasks.append((job, path, fmt))
+
+    rendered = {}
+    if tasks:
+        if workers == 1:
+            rendered = dict(map(_render, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                rendered = dict(pool.map(_render, tasks))
+
+    for name in rendered:
+        manifest[name] = hashes[name]
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return rendered, skipped
+
+
+# Jobs of the AHP charts of visualization.py
+def ahp_figure_jobs(results):
+    return [FigureJob(name, f"visualization:{draw.__name__}", results) for name, draw in FIGURES.items()]
+
+
+# Job of the PRR chart of sensitivity_analysis.py
+def prr_figure_jobs(data):
+    return [FigureJob("prr", "sensitivity_analysis:draw_prr", data)]
+
+
+# Jobs of the per-category EMV lines of qG.py
+def emv_figure_jobs(strategies, base_prob):
+    return [FigureJob(f"emv_{data['category']}", "qG:draw_emv_lines", data)
+            for data in sensitivity_plot_data(strategies, base_prob)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render all figures headless to files")
+    parser.add_argument("--output-dir", default="figures")
+    parser.add_argument("--format", default="png", choices=["png", "svg"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--n-experts", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--N", type=int, default=10000, help="PRR samples per s value")
+    parser.add_argument("--force", action="store_true", help="render even unchanged figures")
+    args = parser.parse_args()
+
+    jobs = ahp_figure_jobs(cached_ahp_analysis(n_experts=args.n_experts, seed=args.seed))
+    np.random.seed(args.seed)
+    jobs += prr_figure_jobs(parallel_perturbation_analysis(N=args.N, vectorized=True, show=False))
+    jobs += emv_figure_jobs(STRATEGIES, BASE_PROBABILITIES)
+    rendered, skipped = render_figures(jobs, args.output_dir, args.format, args.workers, args.force)
+    for name, path in rendered.items():
+        print(f"{name}: {path}")
+    if skipped:
+        print(f"Unchanged, skipped: {', '.join(skipped)}")
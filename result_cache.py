@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+from ahp_analysis import complete_ahp_analysis
+from batch_ahp import CACHE_DIR
+
+# Content-addressed cache of aggregated analysis results
+RESULT_CACHE_DIR = os.path.join(CACHE_DIR, "results")
+MAX_CACHE_BYTES = 100 * 2**20
+
+# Modules whose source decides the results; any change to them is a new code version
+CODE_MODULES = ["ahp_analysis.py", "aggregation.py", "batch_ahp.py", "hierarchy.py", "random_index.py",
+                "saaty_table.py"]
+
+
+# Function to hash the source of the analysis code
+def code_version():
+    digest = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in CODE_MODULES:
+        with open(os.path.join(base, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+# Function to build the cache key of a computation, its config and seed
+def cache_key(name, config, seed):
+    payload = json.dumps({"name": name, "config": config, "seed": seed, "code": code_version()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Functions to flatten the results dict of complete_ahp_analysis to arrays and back
+def _flatten(results, prefix=""):
+    arrays = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            arrays.update(_flatten(value, f"{prefix}{key}/"))
+        else:
+            arrays[prefix + key] = np.asarray(value)
+    return arrays
+
+
+def _unflatten(arrays, order):
+    results = {}
+    for key in order:
+        *parents, leaf = key.split("/")
+        node = results
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = arrays[key]
+    return results
+
+
+# Function to read cached results, or None on a miss (a missing or damaged entry is a miss)
+def load(key):
+    npz_path = os.path.join(RESULT_CACHE_DIR, key + ".npz")
+    meta_path = os.path.join(RESULT_CACHE_DIR, key + ".json")
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with np.load(npz_path) as data:
+            arrays = {name: data[name] for name in data.files}
+        results = _unflatten(arrays, meta["keys"])
+    except (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile):
+        return None
+
+    # Mark as recently used for the eviction
+    now = time.time()
+    try:
+        os.utime(meta_path, (now, now))
+    except OSError:
+        pass
+    return results
+
+
+# Function to write a cache file through a unique temporary file, so processes that cache the same
+# config at the same time never write the same file; write(f) gets the open binary file
+def _write_atomically(path, write):
+    fd, tmp_path = tempfile.mkstemp(dir=RESULT_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Function to store results under a key, then evict the least recently used entries above max_bytes
+# The .npz goes first: an entry counts only once its .json is in place
+def store(key, results, config=None, seed=None, max_bytes=MAX_CACHE_BYTES):
+    os.makedirs(RESULT_CACHE_DIR, exist_ok=True)
+    arrays = _flatten(results)
+    meta = {"keys": list(arrays), "config": config, "seed": seed, "code": code_version(), "created": time.time()}
+
+    _write_atomically(os.path.join(RESULT_CACHE_DIR, key + ".npz"), lambda f: np.savez_compressed(f, **arrays))
+    _write_atomically(os.path.join(RESULT_CACHE_DIR, key + ".json"),
+                      lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8")))
+    evict(max_bytes)
+
+
+# Function to delete the least recently used entries until the cache fits in max_bytes
+def evict(max_bytes=MAX_CACHE_BYTES):
+    entries = []
+    for name in os.listdir(RESULT_CACHE_DIR):
+        if name.endswith(".json"):
+            key = name[:-5]
+            paths = [os.path.join(RESULT_CACHE_DIR, key + ext) for ext in (".json", ".npz")]
+            size = sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+            entries.append((os.path.getmtime(paths[0]), size, paths))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, paths in sorted(entries):
+        if total <= max_bytes:
+            break
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+        total -= size
+
+
+# Function to run a computation through the cache: compute(**config) is only called on a miss
+# The global NumPy seed is set before computing, so equal keys give equal results
+def cached(compute, config, seed=0, max_bytes=MAX_CACHE_BYTES):
+    key = cache_key(f"{compute.__module__}.{compute.__qualname__}", config, seed)
+    results = load(key)
+    if results is None:
+        np.random.seed(seed)
+        results = compute(**config)
+        store(key, results, config, seed, max_bytes)
+    return results
+
+
+# complete_ahp_analysis through the cache
+def cached_ahp_analysis(n_experts=10, seed=0, aggregation="arithmetic"):
+    return cached(complete_ahp_analysis, {"n_experts": n_experts, "aggregation": aggregation}, seed)
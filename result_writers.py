@@ -0,0 +1,238 @@
+import csv
+import json
+import sys
+import tempfile
+
+import numpy as np
+from hierarchy import AHP_HIERARCHY
+
+# Writers of the results of complete_ahp_analysis. Every writer gets each expert result with
+# write(index, result) (result as returned by ahp_for_one_expert) and the aggregated results with
+# close(summary). Output is kept in memory and written in blocks of buffer_size experts,
+# so large runs do not pay for one write call per line.
+
+
+# Function to format the report of one expert (the Greek report printed by complete_ahp_analysis)
+def format_expert_report(index, result):
+    weights, crs = result["weights"], result["crs"]
+    goal = AHP_HIERARCHY.goal
+    lines = [f"\n\t\t\t ΕΙΔΙΚΟΣ {index + 1}\n", "1. ΒΑΡΗ ΚΡΙΤΗΡΙΩΝ:"]
+    lines += [f"{c.name}: {w:.4f}" for c, w in zip(goal.children, weights[goal.key])]
+    lines.append(f"CR: {crs[goal.key]:.4f}")
+
+    lines.append("\n2. ΒΑΡΗ ΥΠΟΚΡΙΤΗΡΙΩΝ:")
+    for i, criterion in enumerate(goal.children):
+        lines.append(("" if i == 0 else "\n") + f"{criterion.name}:")
+        lines += [f"{s.name}: {w:.4f}" for s, w in zip(criterion.children, weights[criterion.key])]
+        lines.append(f"CR: {crs[criterion.key]:.4f}")
+
+    lines.append("\n3. ΤΕΛΙΚΗ ΒΑΘΜΟΛΟΓΙΑ ΕΝΑΛΛΑΚΤΙΚΩΝ:")
+    lines += [f"{alt}: {score:.4f}" for alt, score in zip(AHP_HIERARCHY.alternatives, result["scores"])]
+    return "\n".join(lines) + "\n"
+
+
+# Function to format the final (aggregated) results
+def format_summary_report(summary):
+    goal = AHP_HIERARCHY.goal
+    lines = ["\n\t\t\t ΣΥΝΟΛΙΚΑ ΤΕΛΙΚΑ ΑΠΟΤΕΛΕΣΜΑΤΑ\n", "1. ΜΕΣΟΙ ΟΡΟΙ ΒΑΡΩΝ ΚΡΙΤΗΡΙΩΝ:"]
+    lines += [f"{c.name}: {w:.4f}" for c, w in zip(goal.children, summary["criteria_weights"])]
+
+    lines.append("\n2. ΜΕΣΟΙ ΟΡΟΙ ΥΠΟΚΡΙΤΗΡΙΩΝ:")
+    for i, criterion in enumerate(goal.children):
+        lines.append(("" if i == 0 else "\n") + f"{criterion.name}:")
+        lines += [f"{s.name}: {w:.4f}"
+                  for s, w in zip(criterion.children, summary["subcriteria_weights"][criterion.name])]
+
+    lines.append("\n3. ΜΕΣΟΙ ΟΡΟΙ ΒΑΘΜΟΛΟΓΙΩΝ ΕΝΑΛΛΑΚΤΙΚΩΝ:")
+    lines += [f"{alt}: {score:.4f}" for alt, score in zip(AHP_HIERARCHY.alternatives, summary["alternative_scores"])]
+    return "\n".join(lines) + "\n"
+
+
+# Function to name the flat columns of one expert result: the weights of every node,
+# the CR of every node and the alternative scores
+def result_columns():
+    columns = []
+    for node in AHP_HIERARCHY.nodes:
+        names = [child.name for child in node.children] or AHP_HIERARCHY.alternatives
+        columns += [f"{node.key}:{name}" for name in names]
+    columns += [f"cr:{node.key}" for node in AHP_HIERARCHY.nodes]
+    columns += [f"score:{alt}" for alt in AHP_HIERARCHY.alternatives]
+    return columns
+
+
+# Function to flatten one expert result to a row of floats in the order of result_columns()
+def result_row(result):
+    keys = [node.key for node in AHP_HIERARCHY.nodes]
+    return np.concatenate([np.concatenate([result["weights"][key] for key in keys]),
+                           [result["crs"][key] for key in keys],
+                           result["scores"]])
+
+
+# Function to format one expert result as a JSON line
+def format_json_line(index, result):
+    return json.dumps({"expert": index,
+                       "weights": {key: value.tolist() for key, value in result["weights"].items()},
+                       "crs": {key: float(value) for key, value in result["crs"].items()},
+                       "scores": result["scores"].tolist()}, ensure_ascii=False) + "\n"
+
+
+# Function to format one expert result as a CSV row
+def format_csv_row(index, result):
+    return [index] + result_row(result).tolist()
+
+
+# Buffered writer: keeps formatter(index, result) of each expert and writes them in blocks
+class BufferedWriter:
+    def __init__(self, stream, formatter, buffer_size=1000):
+        self.stream = stream
+        self.formatter = formatter
+        self.buffer_size = buffer_size
+        self.buffer = []
+
+    def write(self, index, result):
+        self.buffer.append(self.formatter(index, result))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write("".join(self.buffer))
+            self.buffer = []
+
+    def close(self, summary=None):
+        self.flush()
+        self.stream.flush()
+
+
+# The Greek report: per expert (unless per_expert=False) and the final results
+class ReportWriter(BufferedWriter):
+    def __init__(self, stream=None, per_expert=True, buffer_size=100):
+        super().__init__(sys.stdout if stream is None else stream, format_expert_report, buffer_size)
+        self.per_expert = per_expert
+
+    def write(self, index, result):
+        if self.per_expert:
+            super().write(index, result)
+
+    def close(self, summary=None):
+        if summary is not None:
+            self.buffer.append(format_summary_report(summary))
+        super().close()
+
+
+# Base of the writers that own their output file
+class FileWriter(BufferedWriter):
+    def __init__(self, path, formatter, buffer_size=1000, newline=None):
+        super().__init__(open(path, "w", encoding="utf-8", newline=newline), formatter, buffer_size)
+
+    def close(self, summary=None):
+        super().close(summary)
+        self.stream.close()
+
+
+# One JSON object per expert; the aggregated results as a last line with "summary": true
+class JSONLinesWriter(FileWriter):
+    def __init__(self, path, buffer_size=1000):
+        super().__init__(path, format_json_line, buffer_size)
+
+    def close(self, summary=None):
+        if summary is not None:
+            self.buffer.append(json.dumps({
+                "summary": True,
+                "criteria_weights": summary["criteria_weights"].tolist(),
+                "subcriteria_weights": {key: value.tolist() for key, value in summary["subcriteria_weights"].items()},
+                "alternative_scores": summary["alternative_scores"].tolist()
+            }, ensure_ascii=False) + "\n")
+        super().close(summary)
+
+
+# One row per expert with the columns of result_columns()
+class CSVWriter(FileWriter):
+    def __init__(self, path, buffer_size=1000):
+        super().__init__(path, format_csv_row, buffer_size, newline="")
+        self.csv = csv.writer(self.stream)
+        self.csv.writerow(["expert"] + result_columns())
+
+    def flush(self):
+        if self.buffer:
+            self.csv.writerows(self.buffer)
+            self.buffer = []
+
+
+# Function to find the slice of every .npz column in a row of result_row():
+# [(name, start, stop, is_vector)] for the weights and CR of every node and the scores
+def npz_columns():
+    columns, start = [], 0
+    for node in AHP_HIERARCHY.nodes:
+        size = AHP_HIERARCHY.size(node.key)
+        columns.append((f"weights/{node.key}", start, start + size, True))
+        start += size
+    for node in AHP_HIERARCHY.nodes:
+        columns.append((f"crs/{node.key}", start, start + 1, False))
+        start += 1
+    columns.append(("scores", start, start + len(AHP_HIERARCHY.alternatives), True))
+    return columns
+
+
+# Columnar dump: one (n_experts, ...) array per weight vector, CR and the scores,
+# plus the aggregated results under "summary/...", written as one .npz on close.
+# Rows are gathered in a fixed-size block that is appended to a temporary file when full; on close
+# the columns are written from a memory map of that file, so memory does not grow with the experts
+class NPZWriter:
+    def __init__(self, path, compressed=False, buffer_size=10000):
+        self.path = path
+        self.compressed = compressed
+        self.columns = npz_columns()
+        self.rows = np.empty((buffer_size, self.columns[-1][2]))
+        self.indices = np.empty(buffer_size, dtype=np.int64)
+        self.n_buffered, self.n_rows = 0, 0
+        self.rows_file = tempfile.TemporaryFile()
+        self.indices_file = tempfile.TemporaryFile()
+
+    def write(self, index, result):
+        self.rows[self.n_buffered] = result_row(result)
+        self.indices[self.n_buffered] = index
+        self.n_buffered += 1
+        if self.n_buffered == len(self.rows):
+            self.flush()
+
+    def flush(self):
+        self.rows_file.write(self.rows[:self.n_buffered].tobytes())
+        self.indices_file.write(self.indices[:self.n_buffered].tobytes())
+        self.n_rows += self.n_buffered
+        self.n_buffered = 0
+
+    def close(self, summary=None):
+        self.flush()
+        self.rows_file.flush()
+        self.indices_file.flush()
+        if self.n_rows:
+            rows = np.memmap(self.rows_file, dtype=float, mode="r", shape=(self.n_rows, self.rows.shape[1]))
+            indices = np.memmap(self.indices_file, dtype=np.int64, mode="r", shape=(self.n_rows,))
+        else:
+            rows, indices = np.empty((0, self.rows.shape[1])), np.empty(0, dtype=np.int64)
+
+        arrays = {"expert": indices}
+        for name, start, stop, is_vector in self.columns:
+            arrays[name] = rows[:, start:stop] if is_vector else rows[:, start]
+        if summary is not None:
+            arrays["summary/criteria_weights"] = summary["criteria_weights"]
+            for name, value in summary["subcriteria_weights"].items():
+                arrays[f"summary/subcriteria_weights/{name}"] = value
+            arrays["summary/alternative_scores"] = summary["alternative_scores"]
+        (np.savez_compressed if self.compressed else np.savez)(self.path, **arrays)
+
+        del rows, indices, arrays
+        self.rows_file.close()
+        self.indices_file.close()
+
+
+# Function to pick a file writer by the extension of the path (.jsonl, .csv or .npz)
+def writer_for_path(path):
+    if path.endswith(".jsonl"):
+        return JSONLinesWriter(path)
+    if path.endswith(".csv"):
+        return CSVWriter(path)
+    if path.endswith(".npz"):
+        return NPZWriter(path)
+    raise ValueError(f"Unknown output format: {path} (use .jsonl, .csv or .npz)")
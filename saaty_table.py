@@ -0,0 +1,100 @@
+import os
+import tempfile
+
+import numpy as np
+from batch_ahp import CACHE_DIR, RANDOM_INDEX, SAATY_SCALE, ahp_batch, reciprocal_matrices, scale_codes
+from instrumentation import count as count_draws, phase
+
+# Cached table of every 3x3 reciprocal matrix on the Saaty scale
+TABLE_PATH = os.path.join(CACHE_DIR, "saaty_3x3.npz")
+_table = None
+
+# CR threshold of the consistent subset; together with the scale and RI it decides the cached table
+CONSISTENT_CR = 0.1
+
+
+# Function to build the table: the scale codes of the upper triangle (a12, a13, a23), weights and CR of all 17^3 matrices
+def build_table():
+    n = len(SAATY_SCALE)
+    codes = np.stack(np.unravel_index(np.arange(n ** 3), (n, n, n)), axis=1).astype(np.uint8)
+    weights, crs = ahp_batch(reciprocal_matrices(SAATY_SCALE[codes], 3))
+    return {"scale": SAATY_SCALE, "random_index": RANDOM_INDEX[3], "cr_threshold": CONSISTENT_CR,
+            "codes": codes, "weights": weights, "crs": crs, "consistent": np.flatnonzero(crs < CONSISTENT_CR)}
+
+
+# Function to write the table under a unique temporary name and move it into place, so processes that
+# build it at the same time never write the same file. If the move fails, another process wrote it.
+def save_table(table):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **table)
+        os.replace(tmp_path, TABLE_PATH)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if not os.path.exists(TABLE_PATH):
+            raise
+
+
+# Function to load the table from disk, building and saving it the first time
+def load_table():
+    global _table
+    if _table is not None:
+        return _table
+
+    try:
+        with np.load(TABLE_PATH) as data:
+            table = {k: data[k] for k in data.files}
+        if (not np.array_equal(table["scale"], SAATY_SCALE) or table["random_index"] != RANDOM_INDEX[3]
+                or table["cr_threshold"] != CONSISTENT_CR):
+            raise ValueError("Cached table was built for another scale, RI or CR threshold")
+    except (OSError, KeyError, ValueError):
+        table = build_table()
+        save_table(table)
+
+    _table = table
+    return _table
+
+
+# Function to find the table index of the scale codes (..., 3) of upper triangles (a12, a13, a23)
+def code_index(codes):
+    codes = np.asarray(codes, dtype=np.intp)
+    n = len(SAATY_SCALE)
+    return (codes[..., 0] * n + codes[..., 1]) * n + codes[..., 2]
+
+
+# Function to find the table index of a stack of (B, 3, 3) scale-valued matrices
+def table_index(matrices):
+    matrices = np.asarray(matrices, dtype=float)
+    return code_index(scale_codes(matrices[..., [0, 0, 1], [1, 2, 2]]))
+
+
+# Function to look up weights and CR of (B, 3, 3) matrices; falls back to computing them if off the scale
+def lookup_3x3(matrices):
+    try:
+        idx = table_index(matrices)
+    except ValueError:
+        return ahp_batch(matrices)
+    # Weights and CR both come from the same index lookup
+    with phase("weighting"):
+        table = load_table()
+        return table["weights"][idx], table["crs"][idx]
+
+
+# Function to look up weights and CR of 3x3 matrices straight from the scale codes of their upper triangles
+def lookup_codes(codes):
+    with phase("weighting"):
+        table = load_table()
+        idx = code_index(codes)
+        return table["weights"][idx], table["crs"][idx]
+
+
+# Function to draw consistent 3x3 matrices uniformly from the pre-filtered subset of the table
+def sample_consistent_3x3(count=None, rng=None):
+    rng = np.random if rng is None else rng
+    table = load_table()
+    idx = rng.choice(table["consistent"], size=count)
+    count_draws("table_draws", 1 if count is None else count)
+    return reciprocal_matrices(SAATY_SCALE[table["codes"][idx]], 3)
@@ -0,0 +1,161 @@
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+from decision_engine import emv, evpi, evsi
+
+# Scenario formats, one scenario (a set of strategies for one decision) per line/row:
+#   JSON lines: {"id": ..., "costs": [K], "payoffs": [[S] * K], "probabilities": [S],
+#                "likelihoods": [[S] * M] (optional, test outcomes x states)}
+#   CSV: columns id, cost_<k>, payoff_<k>_<s>, prob_<s> and optionally lik_<m>_<s> (1-based indices)
+# payoffs are gross results as in qG's strategies dict; the cost is subtracted per strategy
+# In the results, "best" is the 1-based number of the strategy with the highest EMV
+
+
+# Function to read JSON-lines scenarios as tuples (id, costs, payoffs, probabilities, likelihoods)
+def _read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield (record.get("id", line_no), record["costs"], record["payoffs"],
+                   record["probabilities"], record.get("likelihoods"))
+
+
+# Function to read CSV scenarios as tuples (id, costs, payoffs, probabilities, likelihoods)
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = {name: i for i, name in enumerate(header)}
+
+        # Shape of the scenarios from the column names
+        def count(prefix, part):
+            return max((int(name.split("_")[part]) for name in header if name.startswith(prefix)), default=0)
+        n_strategies, n_states, n_signals = count("cost_", 1), count("prob_", 1), count("lik_", 1)
+
+        cost_cols = [columns[f"cost_{k}"] for k in range(1, n_strategies + 1)]
+        payoff_cols = [[columns[f"payoff_{k}_{s}"] for s in range(1, n_states + 1)] for k in range(1, n_strategies + 1)]
+        prob_cols = [columns[f"prob_{s}"] for s in range(1, n_states + 1)]
+        lik_cols = [[columns[f"lik_{m}_{s}"] for s in range(1, n_states + 1)] for m in range(1, n_signals + 1)]
+
+        # Only the numeric columns are parsed (ids and other columns may be any text); a blank one is an error
+        def number(row, row_no, col):
+            value = row[col].strip()
+            if not value:
+                raise ValueError(f"{path}: row {row_no + 2}: column {header[col]} is empty")
+            return float(value)
+
+        for row_no, row in enumerate(reader):
+            yield (row[columns["id"]] if "id" in columns else row_no,
+                   [number(row, row_no, c) for c in cost_cols],
+                   [[number(row, row_no, c) for c in cols] for cols in payoff_cols],
+                   [number(row, row_no, c) for c in prob_cols],
+                   [[number(row, row_no, c) for c in cols] for cols in lik_cols] if n_signals else None)
+
+
+# Function to stream scenarios in chunks of stacked arrays; a chunk ends early when the shape changes
+def iter_scenario_chunks(path, chunk_size=10000):
+    reader = _read_csv if path.endswith(".csv") else _read_jsonl
+    chunk, shape = [], None
+    for scenario in reader(path):
+        scenario_shape = (np.shape(scenario[2]), np.shape(scenario[4]))
+        if chunk and (len(chunk) == chunk_size or scenario_shape != shape):
+            yield _stack(chunk)
+            chunk = []
+        chunk.append(scenario)
+        shape = scenario_shape
+    if chunk:
+        yield _stack(chunk)
+
+
+def _stack(chunk):
+    ids = [s[0] for s in chunk]
+    costs = np.array([s[1] for s in chunk], dtype=float)
+    payoffs = np.array([s[2] for s in chunk], dtype=float) - costs[..., None]
+    priors = np.array([s[3] for s in chunk], dtype=float)
+    likelihoods = np.array([s[4] for s in chunk], dtype=float) if chunk[0][4] is not None else None
+    return ids, payoffs, priors, likelihoods
+
+
+# Function to evaluate a chunk: EMV of every strategy, the best strategy, EVPI and EVSI
+def evaluate_chunk(payoffs, priors, likelihoods=None):
+    emvs = emv(payoffs, priors)
+    results = {
+        "emv": emvs,
+        "best": emvs.argmax(axis=-1),
+        "evpi": evpi(payoffs, priors)
+    }
+    if likelihoods is not None:
+        results["evsi"] = evsi(payoffs, likelihoods, priors)
+    return results
+
+
+# Writer that appends the results of each chunk to a CSV or JSON-lines file
+class ResultWriter:
+    def __init__(self, path):
+        self.csv = path.endswith(".csv")
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file) if self.csv else None
+        self.header = None
+
+    def write_chunk(self, ids, results):
+        if self.csv:
+            # One header for the whole file: scenarios with another number of strategies
+            # or with / without likelihoods would not line up with it
+            n_strategies = results["emv"].shape[-1]
+            header = ["id"] + [f"emv_{k}" for k in range(1, n_strategies + 1)] + ["best", "evpi"]
+            header += ["evsi"] if "evsi" in results else []
+            if self.header is None:
+                self.writer.writerow(header)
+                self.header = header
+            elif header != self.header:
+                raise ValueError(f"Scenario {ids[0]} has columns {header[1:]}, but the CSV output has "
+                                 f"{self.header[1:]}; write scenarios of different shapes to a .jsonl file")
+            columns = [results["emv"], results["best"][:, None] + 1, results["evpi"][:, None]]
+            if "evsi" in results:
+                columns.append(results["evsi"][:, None])
+            for scenario_id, row in zip(ids, np.hstack(columns)):
+                self.writer.writerow([scenario_id] + [f"{v:.6g}" for v in row])
+        else:
+            lines = []
+            for i, scenario_id in enumerate(ids):
+                record = {"id": scenario_id, "emv": results["emv"][i].tolist(),
+                          "best": int(results["best"][i]) + 1, "evpi": float(results["evpi"][i])}
+                if "evsi" in results:
+                    record["evsi"] = float(results["evsi"][i])
+                lines.append(json.dumps(record, ensure_ascii=False))
+            self.file.write("\n".join(lines) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Function to score a scenario file chunk by chunk; memory is bounded by chunk_size
+def run_batch(input_path, output_path, chunk_size=10000):
+    n_scenarios = 0
+    with ResultWriter(output_path) as writer:
+        for ids, payoffs, priors, likelihoods in iter_scenario_chunks(input_path, chunk_size):
+            writer.write_chunk(ids, evaluate_chunk(payoffs, priors, likelihoods))
+            n_scenarios += len(ids)
+    return n_scenarios
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch EMV/EVPI/EVSI evaluation of scenario files")
+    parser.add_argument("input", help="scenarios (.csv or .jsonl)")
+    parser.add_argument("output", help="results (.csv or .jsonl)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+    n = run_batch(args.input, args.output, args.chunk_size)
+    print(f"{n} scenarios -> {os.path.abspath(args.output)}")
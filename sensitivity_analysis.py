@@ -1,49 +1,180 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from tqdm import tqdm
+from instrumentation import count, phase
 
+# Αρχικά δεδομένα AHP της μελέτης
+CRITERIA = ['Οικονομικά θέματα', 'Απόδοση', 'Κοινωνική αποδοχή']
+ORIGINAL_WEIGHTS = np.array([0.1638, 0.5390, 0.2973])
+ALTERNATIVES = ['Ιστοσελίδα', 'Mobile εφαρμογή', 'Κεντρικό σύστημα']
+ORIGINAL_SCORES = np.array([0.3903, 0.2943, 0.3154])
 
-def parallel_perturbation_analysis():
-    # Αρχικά δεδομένα AHP
-    criteria = ['Οικονομικά θέματα', 'Απόδοση', 'Κοινωνική αποδοχή']
-    original_weights = np.array([0.1638, 0.5390, 0.2973])
-    alternatives = ['Ιστοσελίδα', 'Mobile εφαρμογή', 'Κεντρικό σύστημα']
-    original_scores = np.array([0.3903, 0.2943, 0.3154])
+# Παράμετροι Monte Carlo: εύρος διαταραχών s
+S_VALUES = np.arange(0.2, 0.7, 0.1)
 
-    # Παράμετροι Monte Carlo
-    N = 10000  # Αριθμός επαναλήψεων
-    s_values = np.arange(0.2, 0.7, 0.1)  # Εύρος διαταραχών
 
-    # Αποθήκευση αποτελεσμάτων
-    prr_matrix = np.zeros((len(s_values), len(alternatives)))
+# Κλασικός υπολογισμός PRR με βρόχο ανά επανάληψη
+# progress=False δεν εισάγει καθόλου το tqdm
+def prr_loop(original_weights, original_scores, s_values, N, progress=True):
+    if progress:
+        from tqdm import tqdm
+        s_values = tqdm(s_values, desc="Παραμετροποίηση s")
+    with phase("monte_carlo"):
+        prr_matrix = np.zeros((len(s_values), len(original_scores)))
 
-    for s_idx, s in enumerate(tqdm(s_values, desc="Παραμετροποίηση s")):
-        rank_reversals = np.zeros(len(alternatives))
+        for s_idx, s in enumerate(s_values):
+            rank_reversals = np.zeros(len(original_scores))
 
-        for _ in range(N):
-            # 1. Παράλληλη παραμετροποίηση βαρών (ομοιόμορφη κατανομή)
-            perturbations = np.random.uniform(-s / 2, s / 2, size=len(criteria))
-            new_weights = original_weights * (1 + perturbations)
-            new_weights = new_weights / np.sum(new_weights)  # Κανονικοποίηση
+            for _ in range(N):
+                # 1. Παράλληλη παραμετροποίηση βαρών (ομοιόμορφη κατανομή)
+                perturbations = np.random.uniform(-s / 2, s / 2, size=len(original_weights))
+                new_weights = original_weights * (1 + perturbations)
+                new_weights = new_weights / np.sum(new_weights)  # Κανονικοποίηση
 
-            # 2. Υπολογισμός νέων σκορ (απλοποιημένο μοντέλο)
-            # Προσομοίωση αλλαγών στις υποκριτηριακές αξιολογήσεις
-            subcriteria_perturb = np.random.uniform(-s / 2, s / 2, size=(3, 3))
-            new_scores = original_scores * (1 + subcriteria_perturb.mean(axis=1))
-            new_scores = new_scores / np.sum(new_scores)
+                # 2. Υπολογισμός νέων σκορ (απλοποιημένο μοντέλο)
+                # Προσομοίωση αλλαγών στις υποκριτηριακές αξιολογήσεις
+                subcriteria_perturb = np.random.uniform(-s / 2, s / 2, size=(3, 3))
+                new_scores = original_scores * (1 + subcriteria_perturb.mean(axis=1))
+                new_scores = new_scores / np.sum(new_scores)
 
-            # 3. Έλεγχος αναστροφής κατάταξης
-            original_rank = np.argsort(-original_scores)
-            new_rank = np.argsort(-new_scores)
+                # 3. Έλεγχος αναστροφής κατάταξης
+                original_rank = np.argsort(-original_scores)
+                new_rank = np.argsort(-new_scores)
 
-            for i in range(len(alternatives)):
-                if original_rank[i] != new_rank[i]:
-                    rank_reversals[i] += 1
+                for i in range(len(original_scores)):
+                    if original_rank[i] != new_rank[i]:
+                        rank_reversals[i] += 1
 
-        # 4. Υπολογισμός PRR
-        prr_matrix[s_idx, :] = rank_reversals / N
+            # 4. Υπολογισμός PRR
+            prr_matrix[s_idx, :] = rank_reversals / N
+
+    count("samples", N * len(s_values))
+    return prr_matrix
+
+
+# Διανυσματικός υπολογισμός PRR: όλα τα δείγματα κάθε τμήματος (chunk) για όλα τα s με πράξεις πινάκων
+# Τα διαταραγμένα βάρη κριτηρίων δεν επηρεάζουν τα νέα σκορ στο απλοποιημένο μοντέλο, οπότε δεν παράγονται
+def prr_vectorized(original_scores, s_values, N, rng=None, chunk_size=100000):
+    rng = np.random if rng is None else rng
+    s_values = np.asarray(s_values, dtype=float)
+    n_alt = len(original_scores)
+    original_rank = np.argsort(-original_scores)
+    rank_reversals = np.zeros((len(s_values), n_alt))
+
+    with phase("monte_carlo"):
+        for start in range(0, N, chunk_size):
+            n = min(chunk_size, N - start)
+
+            # Διαταραχές (s, n, 3, 3) ~ U(-s/2, s/2) και νέα κανονικοποιημένα σκορ (s, n, 3)
+            subcriteria_perturb = rng.uniform(-0.5, 0.5, size=(len(s_values), n, n_alt, 3))
+            subcriteria_perturb *= s_values[:, None, None, None]
+            new_scores = original_scores * (1 + subcriteria_perturb.mean(axis=-1))
+            new_scores /= new_scores.sum(axis=-1, keepdims=True)
+
+            # Αναστροφές κατάταξης ανά θέση με αναγωγή πινάκων
+            new_rank = np.argsort(-new_scores, axis=-1)
+            rank_reversals += (new_rank != original_rank).sum(axis=1)
+
+    count("samples", N * len(s_values))
+    return rank_reversals / N
+
+
+# Αναστροφές κατάταξης ανά θέση (n, εναλλακτικές) για ομοιόμορφα δείγματα u ∈ [0, 1) σχήματος (n, εναλλακτικές, 3)
+def rank_changes(original_scores, s, u):
+    new_scores = original_scores * (1 + s * (u - 0.5).mean(axis=-1))
+    new_scores /= new_scores.sum(axis=-1, keepdims=True)
+    return (np.argsort(-new_scores, axis=-1) != np.argsort(-original_scores)).astype(float)
+
+
+# Μισό εύρος του διαστήματος εμπιστοσύνης· χωρίς καμία αναστροφή (ή με αναστροφή σε κάθε δείγμα) σε n δείγματα
+# η δειγματική διασπορά είναι 0, οπότε ισχύει ο "κανόνας των 3" (3/n)
+def _half_width(mean, half_width, n):
+    return np.where((mean == 0) | (mean == 1), 3 / n, half_width)
+
+
+# Έλεγχος τερματισμού: κάθε PRR με μισό εύρος ≤ tol (και ≤ rel_tol·PRR, αν δοθεί)
+# Για PRR = 0 ισχύει μόνο ο απόλυτος έλεγχος (κανόνας των τριών, 3/n ≤ tol), αφού rel_tol·0 = 0
+def _converged(mean, half_width, tol, rel_tol):
+    done = half_width <= tol
+    if rel_tol is not None:
+        done &= (mean == 0) | (half_width <= rel_tol * mean)
+    return bool(done.all())
+
+
+# Εκτίμηση PRR με μειωμένη διακύμανση και προσαρμοστικό τερματισμό: κάθε s δειγματοληπτείται μέχρι το
+# διάστημα εμπιστοσύνης κάθε PRR να γίνει στενότερο από tol ή να φτάσει τα max_samples δείγματα.
+# estimator: "plain" (ανεξάρτητα δείγματα), "antithetic" (ζεύγη u, 1 - u) ή "sobol"
+# (replicates ανεξάρτητες scrambled Sobol ακολουθίες, το σφάλμα από τη διασπορά μεταξύ τους· απαιτεί scipy)
+# Επιστρέφει PRR (s, εναλλακτικές), μισό εύρος του διαστήματος εμπιστοσύνης και πλήθος δειγμάτων ανά s
+def prr_adaptive(original_scores, s_values, estimator="plain", tol=0.005, rel_tol=None, confidence=0.95,
+                 batch_size=4096, max_samples=10**6, replicates=16, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    s_values = np.asarray(s_values, dtype=float)
+    n_alt = len(original_scores)
+    prr_matrix = np.zeros((len(s_values), n_alt))
+    half_widths = np.zeros((len(s_values), n_alt))
+    samples = np.zeros(len(s_values), dtype=np.int64)
+
+    if estimator == "sobol":
+        from scipy.stats import qmc, t
+        z = t.ppf(0.5 + confidence / 2, replicates - 1)
+        # Δυνάμεις του 2 ανά ακολουθία, ώστε να διατηρείται η ισοκατανομή των σημείων Sobol
+        first_batch = 2 ** int(np.ceil(np.log2(max(batch_size // replicates, 1))))
+    elif estimator in ("plain", "antithetic"):
+        from statistics import NormalDist
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    else:
+        raise ValueError(f"Unknown PRR estimator: {estimator}")
+
+    with phase("monte_carlo"):
+        for idx, s in enumerate(s_values):
+            if estimator == "sobol":
+                engines = [qmc.Sobol(3 * n_alt, scramble=True, seed=rng) for _ in range(replicates)]
+                sums = np.zeros((replicates, n_alt))
+                m, m_next = 0, first_batch
+                while True:
+                    for r, engine in enumerate(engines):
+                        u = engine.random(m_next).reshape(m_next, n_alt, 3)
+                        sums[r] += rank_changes(original_scores, s, u).sum(axis=0)
+                    m += m_next
+                    n = m * replicates
+                    means = sums / m
+                    mean = means.mean(axis=0)
+                    half_width = _half_width(mean, z * means.std(axis=0, ddof=1) / np.sqrt(replicates), n)
+                    if _converged(mean, half_width, tol, rel_tol) or n >= max_samples:
+                        break
+                    m_next = m  # Διπλασιασμός
+            else:
+                # Μονάδες: μεμονωμένα δείγματα ή ζεύγη (μέσος όρος u και 1 - u)
+                units = batch_size // 2 if estimator == "antithetic" else batch_size
+                total, total_sq, n_units, n = np.zeros(n_alt), np.zeros(n_alt), 0, 0
+                while True:
+                    u = rng.random((units, n_alt, 3))
+                    y = rank_changes(original_scores, s, u)
+                    if estimator == "antithetic":
+                        y = (y + rank_changes(original_scores, s, 1 - u)) / 2
+                        n += 2 * units
+                    else:
+                        n += units
+                    total += y.sum(axis=0)
+                    total_sq += (y ** 2).sum(axis=0)
+                    n_units += units
+                    mean = total / n_units
+                    variance = np.maximum(total_sq - n_units * mean ** 2, 0) / (n_units - 1)
+                    half_width = _half_width(mean, z * np.sqrt(variance / n_units), n)
+                    if _converged(mean, half_width, tol, rel_tol) or n >= max_samples:
+                        break
+
+            prr_matrix[idx], half_widths[idx], samples[idx] = mean, half_width, n
+            count("samples", n)
+
+    return prr_matrix, half_widths, samples
+
+
+# Οπτικοποίηση αποτελεσμάτων σε νέο σχήμα, χωρίς εμφάνιση (ώστε να μπορεί να αποθηκευτεί και σε αρχείο)
+def draw_prr(data):
+    s_values, prr_matrix = data["s_values"], data["prr_matrix"]
+    alternatives, original_scores = data["alternatives"], data["original_scores"]
+    import matplotlib.pyplot as plt
 
-    # 5. Οπτικοποίηση αποτελεσμάτων
     plt.figure(figsize=(14, 6))
 
     # Διάγραμμα PRR vs s
@@ -73,19 +204,54 @@ def parallel_perturbation_analysis():
     plt.grid(True)
 
     plt.tight_layout()
-    plt.show()
 
-    # Εκτύπωση αναλυτικών αποτελεσμάτων
+
+# Εκτύπωση αναλυτικών αποτελεσμάτων
+def print_prr(data):
     print("\nΑρχικές Προτεραιότητες:")
-    for alt, score in zip(alternatives, original_scores):
+    for alt, score in zip(data["alternatives"], data["original_scores"]):
         print(f"{alt}: {score:.4f}")
 
     print("\nΠιθανότητες Αναστροφής Κατάταξης (PRR):")
-    for s, prr in zip(s_values, prr_matrix):
+    for s, prr in zip(data["s_values"], data["prr_matrix"]):
         print(f"\nΓια s={s:.1f}:")
-        for alt, p in zip(alternatives, prr):
+        for alt, p in zip(data["alternatives"], prr):
             print(f"{alt}: {p:.4f}")
 
+    # Πλήθος δειγμάτων και επιτευχθέν σφάλμα της προσαρμοστικής εκτίμησης
+    if "samples" in data:
+        print("\nΔείγματα και σφάλμα (μισό εύρος διαστήματος εμπιστοσύνης):")
+        for s, n, hw in zip(data["s_values"], data["samples"], data["half_width"]):
+            print(f"s={s:.1f}: {n} δείγματα, ±{hw.max():.4f}")
+
+
+# show=False παραλείπει τα διαγράμματα και την εκτύπωση και επιστρέφει μόνο τα δεδομένα (π.χ. για rendering.py)
+# estimator ("plain", "antithetic", "sobol") χρησιμοποιεί την prr_adaptive με ανοχή tol αντί για σταθερό N
+def parallel_perturbation_analysis(N=10000, vectorized=False, show=True, progress=True, estimator=None, tol=0.005,
+                                   rng=None):
+    # Υπολογισμός PRR (N: αριθμός επαναλήψεων ανά s)
+    adaptive = {}
+    if estimator is not None:
+        prr_matrix, half_width, samples = prr_adaptive(ORIGINAL_SCORES, S_VALUES, estimator, tol, rng=rng)
+        adaptive = {"half_width": half_width, "samples": samples}
+    elif vectorized:
+        prr_matrix = prr_vectorized(ORIGINAL_SCORES, S_VALUES, N)
+    else:
+        prr_matrix = prr_loop(ORIGINAL_WEIGHTS, ORIGINAL_SCORES, S_VALUES, N, progress)
+
+    data = {"s_values": S_VALUES, "prr_matrix": prr_matrix,
+            "alternatives": ALTERNATIVES, "original_scores": ORIGINAL_SCORES, **adaptive}
+    if not show:
+        return data
+
+    with phase("plotting"):
+        import matplotlib.pyplot as plt
+        draw_prr(data)
+        plt.show()
+
+    print_prr(data)
+    return data
+
 
 if __name__ == "__main__":
     parallel_perturbation_analysis()
\ No newline at end of file
@@ -1,26 +1,34 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
-from ahp_analysis import complete_ahp_analysis
+from instrumentation import phase
+from result_cache import cached_ahp_analysis
 
 
-def show_visualizations():
-    # Results from ahp_analysis.py
-    results = complete_ahp_analysis(n_experts=10)
+def show_visualizations(n_experts=10, seed=0):
+    # Results from ahp_analysis.py, simulated only if they are not cached for this config, seed and code
+    results = cached_ahp_analysis(n_experts=n_experts, seed=seed)
+    import matplotlib.pyplot as plt
+    with phase("plotting"):
+        for draw in FIGURES.values():
+            draw(results)
+            plt.show()
 
-    criteria = ['Οικονομικά θέματα', 'Απόδοση', 'Κοινωνική αποδοχή']
-    criteria_weights = results["criteria_weights"]
 
-    subcriteria = {
-        'Οικονομικά θέματα': ['Κόστος ανάπτυξης', 'Κόστος συντήρησης'],
-        'Απόδοση': ['Αξιοπιστία', 'Ταχύτητα', 'Ασφάλεια δεδομένων'],
-        'Κοινωνική αποδοχή': ['Συμβατότητα', 'Ευχρηστία']
-    }
-    subcriteria_weights = results["subcriteria_weights"]
+# Names used by the charts
+CRITERIA = ['Οικονομικά θέματα', 'Απόδοση', 'Κοινωνική αποδοχή']
+SUBCRITERIA = {
+    'Οικονομικά θέματα': ['Κόστος ανάπτυξης', 'Κόστος συντήρησης'],
+    'Απόδοση': ['Αξιοπιστία', 'Ταχύτητα', 'Ασφάλεια δεδομένων'],
+    'Κοινωνική αποδοχή': ['Συμβατότητα', 'Ευχρηστία']
+}
+ALTERNATIVES = ['Ιστοσελίδα', 'Mobile εφαρμογή','Κεντρικό σύστημα']
 
-    alternatives = ['Ιστοσελίδα', 'Mobile εφαρμογή','Κεντρικό σύστημα']
-    alternative_scores = results["alternative_scores"]
 
-    #Hierarchy graph
+# Each function below draws one chart on a new figure without showing it,
+# so the chart can be shown interactively or rendered to a file.
+# matplotlib and seaborn are imported only when a chart is drawn
+
+# Hierarchy graph
+def draw_hierarchy(results):
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(14, 7))
     plt.title('Ιεραρχική Δομή Απόφασης AHP')
     # The position of each "box"
@@ -85,19 +93,26 @@ def show_visualizations():
 
     plt.axis('off')
     plt.tight_layout()
-    plt.show()
 
-    # Pie chart for criteria weights
-    plt.pie(criteria_weights, labels=criteria, autopct='%1.1f%%', colors=sns.color_palette('Set2'))
+
+# Pie chart for criteria weights
+def draw_criteria_pie(results):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.figure()
+    plt.pie(results["criteria_weights"], labels=CRITERIA, autopct='%1.1f%%', colors=sns.color_palette('Set2'))
     plt.title('Κατανομή Βαρών Κριτηρίων')
-    plt.show()
 
-    # Bar plot for subcriteria weights
+
+# Bar plot for subcriteria weights
+def draw_subcriteria_bars(results):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
     fig, axes = plt.subplots(1, 3, figsize=(14, 7))
     fig.suptitle('Βάρη Υποκριτηρίων ανά Κριτήριο')
     colors = sns.color_palette('Set2')
-    for ax, (criteria, subs), color in zip(axes, subcriteria.items(), colors):
-        weights = subcriteria_weights[criteria]
+    for ax, (criteria, subs), color in zip(axes, SUBCRITERIA.items(), colors):
+        weights = results["subcriteria_weights"][criteria]
         sns.barplot(x=subs, y=weights, ax=ax, palette=[color, color])
         ax.set_title(criteria)
         ax.set_ylim(0, 1)
@@ -108,17 +123,29 @@ def show_visualizations():
                         textcoords='offset points')
 
     plt.tight_layout()
-    plt.show()
 
-    # Bar plot for alternatives
+
+# Bar plot for alternatives
+def draw_alternative_ranking(results):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    alternative_scores = results["alternative_scores"]
     plt.figure(figsize=(8, 6))
-    sns.barplot(x=alternatives, y=alternative_scores, palette="Blues_d")
+    sns.barplot(x=ALTERNATIVES, y=alternative_scores, palette="Blues_d")
     plt.title('Τελική Κατάταξη Εναλλακτικών Λύσεων')
     for i, v in enumerate(alternative_scores):
         plt.text(i, v + 0.01, f'{v:.2%}', ha='center', va='bottom')
 
     plt.tight_layout()
-    plt.show()
+
+
+# All the charts, in the order they are shown
+FIGURES = {
+    "hierarchy": draw_hierarchy,
+    "criteria_pie": draw_criteria_pie,
+    "subcriteria_bars": draw_subcriteria_bars,
+    "alternative_ranking": draw_alternative_ranking
+}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+import numpy as np
+from hierarchy import AHP_HIERARCHY
+
+
+# Exact weight-stability intervals of an AHP model.
+# Setting the local weight w_k of one (sub)criterion to x and renormalizing its siblings proportionally
+# (w_j -> w_j (1 - x) / (1 - w_k)) moves the global priorities along a line:
+#     scores(x) = scores + (x - w_k) * G * (S_k - T_k)
+# G: global weight of the parent node, S_k: subtree scores of the child, T_k: the siblings' subtree
+# scores weighted by w_j / (1 - w_k). Each pairwise order a > b therefore holds on one interval of x
+# that ends where the two lines cross, so every interval is found exactly, for all weights at once.
+
+
+# Function to list the weights the analysis covers: (parent key, child index) of every
+# criterion and subcriterion weight, in breadth-first order
+def stability_entries(hierarchy=AHP_HIERARCHY):
+    return [(node.key, i) for node in hierarchy.nodes if node.children for i in range(len(node.children))]
+
+
+# Function to compute the stability intervals for the local weights (dict key -> (n,)) of a single model
+# Returns a dict with, per entry of stability_entries():
+#     weight: the current local weight, slope: d scores / d weight (n_alternatives,)
+#     pair_intervals: (n_alt, n_alt, 2) range of the weight over which the order of every pair
+#                     (a, b) is unchanged (both orders of a pair give the same interval)
+#     top_interval: (2,) range over which the top-ranked alternative stays on top
+def weight_stability(weights, hierarchy=AHP_HIERARCHY):
+    entries = stability_entries(hierarchy)
+    subtree = hierarchy.subtree_scores(weights)
+    priorities = hierarchy.node_priorities(weights)
+    scores = subtree[hierarchy.goal.key]
+
+    # One row per entry: current weight, global weight of the parent, S_k and the parent's subtree scores
+    w = np.array([weights[key][i] for key, i in entries])
+    parent_weight = np.array([priorities[key] for key, _ in entries])
+    child_scores = np.array([subtree[hierarchy.by_key[key].children[i].key] for key, i in entries])
+    parent_scores = np.array([subtree[key] for key, _ in entries])
+
+    # T_k = (sum_j w_j S_j - w_k S_k) / (1 - w_k); a weight of 1 leaves no siblings to scale
+    with np.errstate(divide="ignore", invalid="ignore"):
+        siblings = (parent_scores - w[:, None] * child_scores) / (1 - w[:, None])
+    siblings = np.where(w[:, None] < 1, siblings, child_scores)
+    slope = parent_weight[:, None] * (child_scores - siblings)
+
+    # Pairwise differences d_ab(x) = diff_ab + (x - w) * slope_ab and the weight at which they vanish
+    diff = scores[:, None] - scores[None, :]
+    slope_diff = slope[:, :, None] - slope[:, None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = w[:, None, None] - diff / slope_diff
+
+    # The order of (a, b) holds above the crossing if d_ab moves towards its current sign, below it otherwise
+    holds_above = np.sign(slope_diff) == np.sign(diff)
+    flat = (slope_diff == 0) | (diff == 0)
+    low = np.where(holds_above & ~flat, crossing, 0.0)
+    high = np.where(~holds_above & ~flat, crossing, 1.0)
+    pair_intervals = np.stack([np.clip(low, 0.0, 1.0), np.clip(high, 0.0, 1.0)], axis=-1)
+
+    # The top alternative stays on top on the intersection of its pairwise intervals
+    top = np.argmax(scores)
+    top_interval = np.stack([pair_intervals[:, top, :, 0].max(axis=1),
+                             pair_intervals[:, top, :, 1].min(axis=1)], axis=-1)
+
+    return {
+        "entries": entries,
+        "weight": w,
+        "slope": slope,
+        "scores": scores,
+        "top": top,
+        "pair_intervals": pair_intervals,
+        "top_interval": top_interval
+    }
+
+
+# Function to print the intervals of weight_stability
+def print_stability(result, hierarchy=AHP_HIERARCHY):
+    alternatives = hierarchy.alternatives
+    print(f"Κορυφαία εναλλακτική: {alternatives[result['top']]}")
+    print("\nΔιαστήματα σταθερότητας βαρών (η κορυφαία εναλλακτική δεν αλλάζει):")
+    for (key, i), w, (low, high) in zip(result["entries"], result["weight"], result["top_interval"]):
+        name = hierarchy.by_key[key].children[i].name
+        print(f"{name}: {w:.4f} ∈ [{low:.4f}, {high:.4f}]")
+
+
+if __name__ == "__main__":
+    from batch_ahp import ahp_for_matrices
+    from main import judgment_matrices
+    print_stability(weight_stability(ahp_for_matrices(judgment_matrices())[0]))